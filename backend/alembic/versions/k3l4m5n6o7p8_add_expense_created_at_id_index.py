@@ -0,0 +1,29 @@
+"""add (created_at, id) index to expenses for keyset pagination
+
+Revision ID: k3l4m5n6o7p8
+Revises: j2k3l4m5n6o7
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.config import settings
+
+revision: str = 'k3l4m5n6o7p8'
+down_revision: Union[str, Sequence[str], None] = 'j2k3l4m5n6o7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_expense_created_at_id', 'expenses', ['created_at', 'id'], unique=False, schema=SCHEMA
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_expense_created_at_id', table_name='expenses', schema=SCHEMA)
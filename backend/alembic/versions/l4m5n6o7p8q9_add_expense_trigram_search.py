@@ -0,0 +1,53 @@
+"""add trigram search index (accent-insensitive) to expenses
+
+Revision ID: l4m5n6o7p8q9
+Revises: k3l4m5n6o7p8
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.core.config import settings
+
+revision: str = 'l4m5n6o7p8q9'
+down_revision: Union[str, Sequence[str], None] = 'k3l4m5n6o7p8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    """Cria extensões, funções IMMUTABLE de normalização e índice GIN (gin_trgm_ops)."""
+    conn = op.get_bind()
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm WITH SCHEMA public"))
+    conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA public"))
+
+    # unaccent() é STABLE; o wrapper com dicionário explícito pode ser IMMUTABLE (exigido em índices)
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.search_normalize(text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, lower($1)) $$;
+    """))
+    conn.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.expense_search_document(text, text, text)
+        RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        AS $$ SELECT {SCHEMA}.search_normalize(concat_ws(' ', $1, $2, $3)) $$;
+    """))
+    conn.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS idx_expense_search_trgm
+        ON {SCHEMA}.expenses
+        USING gin ({SCHEMA}.expense_search_document(service_name, code, description) public.gin_trgm_ops);
+    """))
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    conn.execute(text(f"DROP INDEX IF EXISTS {SCHEMA}.idx_expense_search_trgm"))
+    conn.execute(text(f"DROP FUNCTION IF EXISTS {SCHEMA}.expense_search_document(text, text, text)"))
+    conn.execute(text(f"DROP FUNCTION IF EXISTS {SCHEMA}.search_normalize(text)"))
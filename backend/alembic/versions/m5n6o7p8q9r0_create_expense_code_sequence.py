@@ -0,0 +1,42 @@
+"""create expense_code_seq for expense codes (DP01, DP02, ...)
+
+Revision ID: m5n6o7p8q9r0
+Revises: l4m5n6o7p8q9
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.core.config import settings
+
+revision: str = 'm5n6o7p8q9r0'
+down_revision: Union[str, Sequence[str], None] = 'l4m5n6o7p8q9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    """Cria a sequência e posiciona após o maior código DPnn existente."""
+    conn = op.get_bind()
+    conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {SCHEMA}.expense_code_seq START WITH 1 MINVALUE 1"))
+    conn.execute(text(f"""
+        SELECT setval(
+            '{SCHEMA}.expense_code_seq',
+            COALESCE(
+                (SELECT MAX(substring(code FROM 3)::bigint)
+                 FROM {SCHEMA}.expenses
+                 WHERE code ~ '^DP[0-9]+$'),
+                0
+            ) + 1,
+            false
+        )
+    """))
+
+
+def downgrade() -> None:
+    op.execute(f"DROP SEQUENCE IF EXISTS {SCHEMA}.expense_code_seq")
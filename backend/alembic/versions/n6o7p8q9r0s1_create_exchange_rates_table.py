@@ -0,0 +1,41 @@
+"""create exchange_rates table (daily rates / last-known-good)
+
+Revision ID: n6o7p8q9r0s1
+Revises: m5n6o7p8q9r0
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.config import settings
+
+revision: str = 'n6o7p8q9r0s1'
+down_revision: Union[str, Sequence[str], None] = 'm5n6o7p8q9r0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    op.create_table(
+        'exchange_rates',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('base_currency', sa.String(3), nullable=False),
+        sa.Column('quote_currency', sa.String(3), nullable=False),
+        sa.Column('rate', sa.Numeric(10, 4), nullable=False),
+        sa.Column('rate_date', sa.Date(), nullable=False),
+        sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('base_currency', 'quote_currency', 'rate_date', name='uq_exchange_rate_pair_date'),
+        schema=SCHEMA
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('exchange_rates', schema=SCHEMA)
@@ -0,0 +1,33 @@
+"""add (validation_month, created_at, id) index to expense_validations for keyset pagination
+
+Revision ID: o7p8q9r0s1t2
+Revises: n6o7p8q9r0s1
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.core.config import settings
+
+revision: str = 'o7p8q9r0s1t2'
+down_revision: Union[str, Sequence[str], None] = 'n6o7p8q9r0s1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    op.create_index(
+        'idx_expense_validation_month_created_id',
+        'expense_validations',
+        ['validation_month', 'created_at', 'id'],
+        unique=False,
+        schema=SCHEMA,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_expense_validation_month_created_id', table_name='expense_validations', schema=SCHEMA)
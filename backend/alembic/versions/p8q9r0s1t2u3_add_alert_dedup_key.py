@@ -0,0 +1,69 @@
+"""add days_before / dedup_key to alerts with unique partial index
+
+Revision ID: p8q9r0s1t2u3
+Revises: o7p8q9r0s1t2
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+
+from app.core.config import settings
+
+revision: str = 'p8q9r0s1t2u3'
+down_revision: Union[str, Sequence[str], None] = 'o7p8q9r0s1t2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    op.add_column('alerts', sa.Column('days_before', sa.Integer(), nullable=True), schema=SCHEMA)
+    op.add_column('alerts', sa.Column('dedup_key', sa.String(255), nullable=True), schema=SCHEMA)
+
+    # Alertas de renovação recentes (ainda dentro da janela de 7 dias): preencher a chave
+    # para não serem recriados pelo novo job. Um alerta por (despesa, nº de dias).
+    # Só para renovações ainda por vir: se a data já passou e foi avançada, a chave com a
+    # renewal_date atual suprimiria o alerta do próximo ciclo.
+    # alert_type/status comparados como texto: os rótulos do enum podem ser os nomes
+    # (maiúsculos, criados pelo SQLAlchemy) ou os valores (minúsculos, migration original).
+    op.execute(text(f"""
+        UPDATE {SCHEMA}.alerts a
+        SET days_before = r.days_before,
+            dedup_key = 'renewal:' || r.expense_id || ':' || r.renewal_date || ':' || r.days_before
+        FROM (
+            SELECT DISTINCT ON (a2.expense_id, d.days_before)
+                a2.id, a2.expense_id, e.renewal_date, d.days_before
+            FROM {SCHEMA}.alerts a2
+            JOIN {SCHEMA}.expenses e ON e.id = a2.expense_id
+            CROSS JOIN LATERAL (
+                SELECT substring(a2.title FROM 'Renovação em ([0-9]+) dia')::int AS days_before
+            ) d
+            WHERE lower(a2.alert_type::text) = 'renewal_upcoming'
+              AND lower(a2.status::text) IN ('pending', 'sent', 'read')
+              AND d.days_before IS NOT NULL
+              AND e.renewal_date >= current_date
+              AND a2.created_at >= now() - interval '8 days'
+            ORDER BY a2.expense_id, d.days_before, a2.created_at DESC
+        ) r
+        WHERE a.id = r.id
+    """))
+
+    op.create_index(
+        'uq_alert_dedup_key',
+        'alerts',
+        ['dedup_key'],
+        unique=True,
+        schema=SCHEMA,
+        postgresql_where=sa.text('dedup_key IS NOT NULL'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('uq_alert_dedup_key', table_name='alerts', schema=SCHEMA)
+    op.drop_column('alerts', 'dedup_key', schema=SCHEMA)
+    op.drop_column('alerts', 'days_before', schema=SCHEMA)
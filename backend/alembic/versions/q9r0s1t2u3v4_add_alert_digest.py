@@ -0,0 +1,45 @@
+"""add daily_digest alert type and payload column to alerts
+
+Revision ID: q9r0s1t2u3v4
+Revises: p8q9r0s1t2u3
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.core.config import settings
+
+revision: str = 'q9r0s1t2u3v4'
+down_revision: Union[str, Sequence[str], None] = 'p8q9r0s1t2u3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    # Novo valor do enum no mesmo formato dos existentes (minúsculo na migration original;
+    # maiúsculo se o tipo foi criado pelo SQLAlchemy a partir dos nomes do enum).
+    op.execute(text("""
+        DO $$ BEGIN
+            IF EXISTS (
+                SELECT 1 FROM pg_enum e JOIN pg_type t ON t.oid = e.enumtypid
+                WHERE t.typname = 'alerttype' AND e.enumlabel = 'RENEWAL_UPCOMING'
+            ) THEN
+                ALTER TYPE alerttype ADD VALUE IF NOT EXISTS 'DAILY_DIGEST';
+            ELSE
+                ALTER TYPE alerttype ADD VALUE IF NOT EXISTS 'daily_digest';
+            END IF;
+        END $$;
+    """))
+    op.add_column('alerts', sa.Column('payload', JSONB(), nullable=True), schema=SCHEMA)
+
+
+def downgrade() -> None:
+    # Valores de enum não podem ser removidos no PostgreSQL; apenas a coluna é removida.
+    op.drop_column('alerts', 'payload', schema=SCHEMA)
@@ -0,0 +1,51 @@
+"""notify new alerts via pg_notify (channel alert_created) for the SSE stream
+
+Revision ID: r0s1t2u3v4w5
+Revises: q9r0s1t2u3v4
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+from app.core.config import settings
+
+revision: str = 'r0s1t2u3v4w5'
+down_revision: Union[str, Sequence[str], None] = 'q9r0s1t2u3v4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+
+def upgrade() -> None:
+    # Payload enxuto (limite do NOTIFY: 8000 bytes); o cliente busca o alerta completo se precisar.
+    op.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.notify_alert_created() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('alert_created', json_build_object(
+                'id', NEW.id,
+                'recipient_id', NEW.recipient_id,
+                'alert_type', lower(NEW.alert_type::text),
+                'status', NEW.status::text,
+                'title', NEW.title,
+                'expense_id', NEW.expense_id,
+                'validation_id', NEW.validation_id,
+                'created_at', NEW.created_at
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    op.execute(text(f"""
+        CREATE TRIGGER trg_alert_created_notify
+        AFTER INSERT ON {SCHEMA}.alerts
+        FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.notify_alert_created()
+    """))
+
+
+def downgrade() -> None:
+    op.execute(text(f"DROP TRIGGER IF EXISTS trg_alert_created_notify ON {SCHEMA}.alerts"))
+    op.execute(text(f"DROP FUNCTION IF EXISTS {SCHEMA}.notify_alert_created()"))
@@ -0,0 +1,94 @@
+"""create alert_unread_counters maintained by statement-level triggers on alerts
+
+Revision ID: s1t2u3v4w5x6
+Revises: r0s1t2u3v4w5
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.config import settings
+
+revision: str = 's1t2u3v4w5x6'
+down_revision: Union[str, Sequence[str], None] = 'r0s1t2u3v4w5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SCHEMA = settings.DATABASE_SCHEMA
+
+# Não lido = PENDING ou SENT (mesma regra de alert_service.UNREAD_STATUSES)
+UNREAD = "status::text IN ('pending', 'sent')"
+
+
+def upgrade() -> None:
+    op.create_table(
+        'alert_unread_counters',
+        sa.Column('user_id', UUID(as_uuid=True), sa.ForeignKey(f'{SCHEMA}.users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('unread_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        schema=SCHEMA,
+    )
+
+    # Um upsert por comando (não por linha): INSERTs em lote atualizam cada usuário uma vez.
+    op.execute(text(f"""
+        CREATE OR REPLACE FUNCTION {SCHEMA}.sync_alert_unread_counters() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO {SCHEMA}.alert_unread_counters AS c (user_id, unread_count, updated_at)
+                SELECT recipient_id, count(*), now() FROM new_rows WHERE {UNREAD} GROUP BY recipient_id
+                ON CONFLICT (user_id) DO UPDATE
+                SET unread_count = c.unread_count + EXCLUDED.unread_count, updated_at = EXCLUDED.updated_at;
+            ELSIF TG_OP = 'UPDATE' THEN
+                -- Variação por usuário (status e/ou destinatário alterados); negativa só
+                -- ocorre para quem já tinha não lidos, logo com linha existente.
+                INSERT INTO {SCHEMA}.alert_unread_counters AS c (user_id, unread_count, updated_at)
+                SELECT recipient_id, sum(delta), now() FROM (
+                    SELECT recipient_id, 1 AS delta FROM new_rows WHERE {UNREAD}
+                    UNION ALL
+                    SELECT recipient_id, -1 AS delta FROM old_rows WHERE {UNREAD}
+                ) d
+                GROUP BY recipient_id
+                HAVING sum(delta) <> 0
+                ON CONFLICT (user_id) DO UPDATE
+                SET unread_count = greatest(c.unread_count + EXCLUDED.unread_count, 0),
+                    updated_at = EXCLUDED.updated_at;
+            ELSE
+                UPDATE {SCHEMA}.alert_unread_counters c
+                SET unread_count = greatest(c.unread_count - d.removed, 0), updated_at = now()
+                FROM (
+                    SELECT recipient_id, count(*) AS removed FROM old_rows WHERE {UNREAD} GROUP BY recipient_id
+                ) d
+                WHERE c.user_id = d.recipient_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    """))
+    for event, referencing in (
+        ("INSERT", "NEW TABLE AS new_rows"),
+        ("UPDATE", "OLD TABLE AS old_rows NEW TABLE AS new_rows"),
+        ("DELETE", "OLD TABLE AS old_rows"),
+    ):
+        op.execute(text(f"""
+            CREATE TRIGGER trg_alert_unread_{event.lower()}
+            AFTER {event} ON {SCHEMA}.alerts
+            REFERENCING {referencing}
+            FOR EACH STATEMENT EXECUTE FUNCTION {SCHEMA}.sync_alert_unread_counters()
+        """))
+
+    op.execute(text(f"""
+        INSERT INTO {SCHEMA}.alert_unread_counters (user_id, unread_count, updated_at)
+        SELECT recipient_id, count(*), now() FROM {SCHEMA}.alerts WHERE {UNREAD} GROUP BY recipient_id
+    """))
+
+
+def downgrade() -> None:
+    for event in ("insert", "update", "delete"):
+        op.execute(text(f"DROP TRIGGER IF EXISTS trg_alert_unread_{event} ON {SCHEMA}.alerts"))
+    op.execute(text(f"DROP FUNCTION IF EXISTS {SCHEMA}.sync_alert_unread_counters()"))
+    op.drop_table('alert_unread_counters', schema=SCHEMA)
@@ -1,15 +1,26 @@
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.security import HTTPAuthorizationCredentials
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
-from app.core.deps import get_current_user, require_roles
+from app.core.deps import StreamSession, get_current_user, get_stream_session, require_roles, security
+from app.core.security import create_stream_token, decode_access_token
 from app.core.permissions import _role_value as role_value
 from app.models.user import User, UserRole
 from app.models.alert import AlertStatus
-from app.schemas.alert import AlertResponse, AlertWithRelationsResponse, AlertStatsResponse
+from app.schemas.alert import (
+    AlertResponse,
+    AlertWithRelationsResponse,
+    AlertStatsResponse,
+    AlertUnreadCountResponse,
+)
 from app.services import alert_service
+from app.services.alert_delivery import alert_delivery_worker
+from app.services.alert_stream import alert_event_stream
 
 router = APIRouter(prefix="/alerts", tags=["Alerts"])
 
@@ -43,6 +54,17 @@ def get_my_alerts(
     return alerts
 
 
+@router.get("/me/unread-count", response_model=AlertUnreadCountResponse)
+def get_my_unread_count(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Quantidade de alertas não lidos do usuário logado (contador mantido por trigger).
+    """
+    return AlertUnreadCountResponse(unread_count=alert_service.get_unread_count(db, current_user.id))
+
+
 @router.get("", response_model=list[AlertWithRelationsResponse])
 def list_alerts(
     recipient_id: UUID | None = Query(None, description="Filtrar por destinatário"),
@@ -73,6 +95,38 @@ def list_alerts(
     return alerts
 
 
+@router.post("/stream-token")
+def create_my_stream_token(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Token curto (ALERT_STREAM_TOKEN_SECONDS) para abrir GET /alerts/stream?token=...
+    com EventSource, sem expor o token de acesso na URL.
+    """
+    session_exp = decode_access_token(credentials.credentials)["exp"]
+    return {
+        "token": create_stream_token(str(current_user.id), session_exp),
+        "expires_in": settings.ALERT_STREAM_TOKEN_SECONDS,
+    }
+
+
+@router.get("/stream")
+async def stream_my_alerts(
+    session: StreamSession = Depends(get_stream_session),
+):
+    """
+    Novos alertas do usuário logado em tempo real (Server-Sent Events, evento "alert").
+    Alimentado por LISTEN/NOTIFY: conexões abertas não consultam o banco.
+    O stream termina (evento "expired") quando o token de acesso da sessão expira.
+    """
+    return StreamingResponse(
+        alert_event_stream(session.user_id, session.expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{alert_id}", response_model=AlertWithRelationsResponse)
 def get_alert(
     alert_id: UUID,
@@ -148,8 +202,12 @@ def process_pending_alerts(
 ):
     """
     Processa alertas pendentes e tenta enviá-los.
+    Com ALERT_DELIVERY_ENABLED, apenas antecipa o worker de entrega (não bloqueia a requisição).
     Apenas admins podem executar.
     """
+    if settings.ALERT_DELIVERY_ENABLED:
+        alert_delivery_worker.wake()
+        return {"queued": True, **alert_delivery_worker.metrics.snapshot()}
     stats = alert_service.process_pending_alerts(db, limit)
     return stats
 
@@ -182,22 +240,22 @@ def get_alert_stats(
     current_user: User = Depends(admin_only)
 ):
     """
-    Retorna estatísticas de alertas.
+    Retorna estatísticas de alertas (uma consulta agrupada por status).
     Apenas admins podem acessar.
     """
-    from app.models.alert import Alert
-    from sqlalchemy import func
-    
-    total = db.query(func.count(Alert.id)).scalar() or 0
-    pending = db.query(func.count(Alert.id)).filter(Alert.status == AlertStatus.PENDING).scalar() or 0
-    sent = db.query(func.count(Alert.id)).filter(Alert.status == AlertStatus.SENT).scalar() or 0
-    failed = db.query(func.count(Alert.id)).filter(Alert.status == AlertStatus.FAILED).scalar() or 0
-    read = db.query(func.count(Alert.id)).filter(Alert.status == AlertStatus.READ).scalar() or 0
-    
-    return AlertStatsResponse(
-        total=total,
-        pending=pending,
-        sent=sent,
-        failed=failed,
-        read=read
-    )
+    return AlertStatsResponse(**alert_service.get_alert_stats(db))
+
+
+@router.get("/delivery/metrics", response_model=dict)
+def get_delivery_metrics(
+    current_user: User = Depends(admin_only)
+):
+    """
+    Métricas do worker de entrega externa (enviados/falhas por canal, retries, throughput).
+    Apenas admins podem acessar.
+    """
+    return {
+        "enabled": settings.ALERT_DELIVERY_ENABLED,
+        "running": alert_delivery_worker.running,
+        **alert_delivery_worker.metrics.snapshot(),
+    }
@@ -9,10 +9,10 @@ from app.core.database import get_db
 from app.core.deps import get_current_user
 from app.core.permissions import _role_value as role_value, get_expense_scope_params
 from app.models.user import User, UserRole
-from app.models.alert import Alert, AlertStatus
+from app.models.alert import Alert
 from app.models.expense_validation import ExpenseValidation, ValidationStatus
 from app.models.expense import Expense
-from app.services import dashboard_service, expense_validation_service
+from app.services import alert_service, dashboard_service, expense_validation_service
 from app.schemas.dashboard import (
     DashboardStatsResponse,
     CategoryExpenseResponse,
@@ -72,32 +72,27 @@ def get_dashboard_stats(
         except (ValueError, IndexError):
             month_date = None
 
-    pending_validations_query = expense_validation_service.get_pending(
+    validation_counts = expense_validation_service.get_status_counts(
         db,
-        month=month_date,
         current_user=current_user,
+        month=month_date,
     )
-    pending_validations = len(pending_validations_query)
-    overdue_validations = sum(1 for validation in pending_validations_query if validation.is_overdue)
+    pending_validations = validation_counts["pending"]
+    overdue_validations = validation_counts["overdue"]
     
-    # Calcular alertas não lidos (respeitando filtro de empresa)
+    # Alertas não lidos: contador por usuário; com filtro de empresa, contagem filtrada
     if company_id:
         unread_alerts = db.query(func.count(Alert.id)).outerjoin(
             Expense, Alert.expense_id == Expense.id
         ).filter(
             and_(
                 Alert.recipient_id == current_user.id,
-                Alert.status == AlertStatus.PENDING,
+                Alert.status.in_(alert_service.UNREAD_STATUSES),
                 Expense.company_id == company_id,
             )
         ).scalar() or 0
     else:
-        unread_alerts = db.query(func.count(Alert.id)).filter(
-            and_(
-                Alert.recipient_id == current_user.id,
-                Alert.status == AlertStatus.PENDING,
-            )
-        ).scalar() or 0
+        unread_alerts = alert_service.get_unread_count(db, current_user.id)
     
     # Atualizar stats com valores calculados
     stats.pending_validations = pending_validations
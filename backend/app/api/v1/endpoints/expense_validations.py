@@ -1,11 +1,12 @@
 from uuid import UUID
-from datetime import date
+from datetime import date, datetime
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Body
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query, Body
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import get_current_user, require_roles
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
 from app.core.permissions import can_access_expense, can_approve_expense
 from app.models.user import User, UserRole
 from app.schemas.expense_validation import (
@@ -16,6 +17,11 @@ from app.schemas.expense_validation import (
     DepartmentBasic,
     UserBasic,
     RejectRequest,
+    BulkDecisionRequest,
+    BulkDecisionResponse,
+    ExpenseValidationPage,
+    ValidationStatusCounts,
+    BackfillJobResponse,
 )
 from app.services import expense_validation_service
 from app.models.expense_validation import ValidationStatus
@@ -25,65 +31,210 @@ router = APIRouter(prefix="/expense-validations", tags=["Expense Validations"])
 # Apenas admins podem executar tarefas administrativas
 admin_only = require_roles([UserRole.FINANCE_ADMIN, UserRole.SYSTEM_ADMIN])
 
+MAX_PREDICTED_MONTHS = 24
+
+
+def _list_filters(
+    company_ids: list[UUID] | None,
+    department_ids: list[UUID] | None,
+    owner_ids: list[UUID] | None,
+    service_name: str | None,
+) -> dict:
+    """Filtros da aba Validações (listas vazias = sem filtro)."""
+    return {
+        "company_ids": company_ids or None,
+        "department_ids": department_ids or None,
+        "owner_ids": owner_ids or None,
+        "service_name": service_name,
+    }
+
+
+def _validation_page(
+    db: Session,
+    current_user: User,
+    cursor: str | None,
+    limit: int,
+    include_total: bool,
+    include_facets: bool,
+    **filters,
+) -> dict:
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, date.fromisoformat, datetime.fromisoformat, UUID)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+    items, next_key, total, facets = expense_validation_service.get_page(
+        db, current_user, after=after, limit=limit,
+        include_total=include_total, include_facets=include_facets, **filters
+    )
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+        "total": total,
+        "facets": facets,
+    }
+
 
 @router.get("/pending", response_model=list[ExpenseValidationWithExpenseResponse])
 def list_pending_validations(
     month: date | None = Query(None, description="Filtrar por mês (primeiro dia do mês)"),
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lista validações pendentes no escopo do usuário (empresa + responsável).
     """
-    validations = expense_validation_service.get_pending(db, month, current_user=current_user)
+    validations = expense_validation_service.get_pending(
+        db, month, current_user=current_user,
+        **_list_filters(company_ids, department_ids, owner_ids, service_name)
+    )
     return validations
 
 
+@router.get("/pending/page", response_model=ExpenseValidationPage)
+def list_pending_validations_page(
+    month: date | None = Query(None, description="Filtrar por mês (primeiro dia do mês)"),
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    cursor: str | None = Query(None, description="Cursor retornado em next_cursor da página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    include_total: bool = Query(False, description="Incluir total de registros (COUNT adicional)"),
+    include_facets: bool = Query(False, description="Incluir contagens por status, empresa, setor e responsável"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Validações pendentes paginadas por cursor (validation_month, created_at, id), mais recente primeiro.
+    """
+    return _validation_page(
+        db, current_user, cursor, limit, include_total, include_facets,
+        statuses=[ValidationStatus.PENDING], month=month,
+        **_list_filters(company_ids, department_ids, owner_ids, service_name),
+    )
+
+
 @router.get("/history", response_model=list[ExpenseValidationWithExpenseResponse])
 def get_validation_history(
     status: ValidationStatus | None = Query(None, description="Filtrar por status"),
     month: date | None = Query(None, description="Filtrar por mês (primeiro dia do mês)"),
     expense_id: UUID | None = Query(None, description="Filtrar por despesa"),
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
     Lista histórico de validações no escopo do usuário.
-    Filtros opcionais: status, mês, despesa.
+    Filtros opcionais: status, mês, despesa, empresa, setor, responsável e nome.
     """
     validations = expense_validation_service.get_history(
-        db, status, month, expense_id, current_user=current_user
+        db, status, month, expense_id, current_user=current_user,
+        **_list_filters(company_ids, department_ids, owner_ids, service_name)
     )
     return validations
 
 
+@router.get("/history/page", response_model=ExpenseValidationPage)
+def get_validation_history_page(
+    status_filter: list[ValidationStatus] | None = Query(None, alias="status", description="Filtrar por status"),
+    month: date | None = Query(None, description="Filtrar por mês (primeiro dia do mês)"),
+    expense_id: UUID | None = Query(None, description="Filtrar por despesa"),
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    cursor: str | None = Query(None, description="Cursor retornado em next_cursor da página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    include_total: bool = Query(False, description="Incluir total de registros (COUNT adicional)"),
+    include_facets: bool = Query(False, description="Incluir contagens por status, empresa, setor e responsável"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Histórico de validações paginado por cursor (validation_month, created_at, id), mais recente primeiro.
+    """
+    return _validation_page(
+        db, current_user, cursor, limit, include_total, include_facets,
+        statuses=status_filter or None, month=month, expense_id=expense_id,
+        **_list_filters(company_ids, department_ids, owner_ids, service_name),
+    )
+
+
+@router.get("/summary", response_model=ValidationStatusCounts)
+def get_validation_summary(
+    month: date | None = Query(None, description="Filtrar por mês (primeiro dia do mês)"),
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Contagens de validações (pendentes, atrasadas, aprovadas, rejeitadas) no escopo do usuário.
+    """
+    return expense_validation_service.get_status_counts(
+        db, current_user=current_user, month=month,
+        **_list_filters(company_ids, department_ids, owner_ids, service_name)
+    )
+
+
 @router.get("/predicted", response_model=list[ExpenseValidationWithExpenseResponse])
 def get_predicted_validations(
-    month: date = Query(..., description="Mês futuro para previsão (primeiro dia do mês)"),
+    month: date | None = Query(None, description="Mês futuro para previsão (primeiro dia do mês)"),
+    month_from: date | None = Query(None, description="Início do intervalo de meses futuros (alternativa a month)"),
+    month_to: date | None = Query(None, description="Fim do intervalo de meses futuros (inclusive)"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Lista validações previstas para um mês futuro.
-    Retorna despesas que teriam validação naquele mês baseado na periodicidade.
+    Lista validações previstas para um mês futuro (month) ou intervalo (month_from..month_to,
+    até MAX_PREDICTED_MONTHS meses).
+    Retorna despesas que teriam validação em cada mês baseado na periodicidade.
     Não cria registros no banco.
     Apenas despesas ATIVAS são consideradas (canceladas não aparecem).
     """
-    from datetime import datetime
-    from uuid import uuid4
-    
+    if month is not None:
+        month_from = month_to = month
+    if month_from is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe month ou month_from/month_to"
+        )
+    first_day_target = month_from.replace(day=1)
+    last_day_target = (month_to or month_from).replace(day=1)
+
     # Validar que é um mês futuro
     today = datetime.now().date()
-    first_day_target = month.replace(day=1)
     first_day_current = today.replace(day=1)
-    
+
     if first_day_target <= first_day_current:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Este endpoint é apenas para meses futuros. Use /pending ou /history para meses passados/atuais."
         )
-    
-    predicted = expense_validation_service.get_predicted_validations(db, first_day_target, current_user=current_user)
+    months_span = (last_day_target.year - first_day_target.year) * 12 + last_day_target.month - first_day_target.month + 1
+    if months_span < 1 or months_span > MAX_PREDICTED_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo inválido: month_to deve ser >= month_from e cobrir no máximo {MAX_PREDICTED_MONTHS} meses"
+        )
+
+    predicted = expense_validation_service.get_predicted_validations(
+        db, first_day_target, last_day_target, current_user=current_user
+    )
     
     # Converter para formato de resposta (criar objetos temporários similares a ExpenseValidation)
     result = []
@@ -154,6 +305,28 @@ def get_predicted_validations(
     return result
 
 
+@router.post("/bulk-decision", response_model=BulkDecisionResponse)
+def bulk_decision(
+    body: BulkDecisionRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aprova ou rejeita várias validações em uma única transação.
+    Cada id recebe um resultado: approved/rejected, not_found, forbidden (fora do escopo
+    de aprovação do usuário) ou already_processed.
+    """
+    results = expense_validation_service.bulk_decide(
+        db,
+        body.validation_ids,
+        approve=body.decision == "approve",
+        current_user=current_user,
+        charged_this_month=body.charged_this_month,
+    )
+    processed = sum(1 for r in results if r["outcome"] in ("approved", "rejected"))
+    return BulkDecisionResponse(decision=body.decision, processed=processed, results=results)
+
+
 @router.get("/{validation_id}", response_model=ExpenseValidationWithExpenseResponse)
 def get_validation(
     validation_id: UUID,
@@ -187,13 +360,13 @@ def approve_validation(
     """
     Aprova validação (apenas se a despesa estiver no escopo do usuário).
     """
-    validation = expense_validation_service.get_by_id(db, validation_id)
-    if not validation:
+    target = expense_validation_service.get_decision_targets(db, [validation_id]).get(validation_id)
+    if not target:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Validação não encontrada"
         )
-    if not can_approve_expense(current_user, validation.expense):
+    if not can_approve_expense(current_user, target):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem permissão para aprovar esta validação"
@@ -219,13 +392,13 @@ def reject_validation(
     Rejeita validação (cancela despesa). Apenas se a despesa estiver no escopo do usuário.
     Body opcional: charged_this_month (se a despesa já foi processada no mês, valor conta no dashboard).
     """
-    validation = expense_validation_service.get_by_id(db, validation_id)
-    if not validation:
+    target = expense_validation_service.get_decision_targets(db, [validation_id]).get(validation_id)
+    if not target:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Validação não encontrada"
         )
-    if not can_approve_expense(current_user, validation.expense):
+    if not can_approve_expense(current_user, target):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem permissão para rejeitar esta validação"
@@ -269,14 +442,16 @@ def admin_cancel_approval(
 
 @router.post("/mark-overdue", status_code=status.HTTP_200_OK)
 def mark_overdue_validations_endpoint(
+    emit_alerts: bool | None = Query(None, description="Criar alertas de validação vencida. Padrão: VALIDATION_OVERDUE_ALERTS"),
     db: Session = Depends(get_db),
     current_user: User = Depends(admin_only)
 ):
     """
-    Marca validações pendentes como atrasadas se passaram 4 dias do início do mês.
+    Marca validações pendentes como atrasadas se passaram VALIDATION_OVERDUE_DAYS dias
+    do início do mês de referência (inclusive meses anteriores).
     Apenas admins podem executar.
     """
-    count = expense_validation_service.mark_overdue_validations(db)
+    count = expense_validation_service.mark_overdue_validations(db, emit_alerts=emit_alerts)
     return {"message": f"{count} validações marcadas como atrasadas", "count": count}
 
 
@@ -305,3 +480,58 @@ def create_monthly_validations_endpoint(
         "count": len(validations),
         "month": month.isoformat()
     }
+
+
+@router.post("/backfill", response_model=BackfillJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def start_validations_backfill(
+    background_tasks: BackgroundTasks,
+    month_from: date = Query(..., description="Primeiro mês do backfill"),
+    month_to: date | None = Query(None, description="Último mês do backfill (inclusive). Padrão: mês atual (APP_TIMEZONE)."),
+    chunk_months: int = Query(3, ge=1, le=12, description="Meses por bloco (um commit por bloco)"),
+    current_user: User = Depends(admin_only)
+):
+    """
+    Gera validações para um intervalo de meses (ex.: meses perdidos com o serviço fora do ar).
+    Roda em background, em blocos com commit por bloco; acompanhe em GET /backfill/{job_id}.
+    Apenas admins podem executar.
+    """
+    from app.tasks.monthly_validation import (
+        MAX_BACKFILL_MONTHS,
+        _get_current_month_date,
+        create_backfill_job,
+        run_backfill_job,
+    )
+
+    month_to = (month_to or _get_current_month_date()).replace(day=1)
+    month_from = month_from.replace(day=1)
+    months_span = (month_to.year - month_from.year) * 12 + month_to.month - month_from.month + 1
+    if months_span < 1 or months_span > MAX_BACKFILL_MONTHS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Intervalo inválido: month_to deve ser >= month_from e cobrir no máximo {MAX_BACKFILL_MONTHS} meses"
+        )
+    job = create_backfill_job(month_from, month_to, chunk_months)
+    background_tasks.add_task(run_backfill_job, job["id"])
+    return job
+
+
+@router.get("/backfill/{job_id}", response_model=BackfillJobResponse)
+def get_validations_backfill(
+    job_id: str,
+    current_user: User = Depends(admin_only)
+):
+    """
+    Progresso de um backfill (meses concluídos, validações criadas, tempo decorrido).
+    Jobs ficam em memória no processo que os executa (com vários workers, outro processo
+    responde 404) e expiram 24h após finalizados.
+    Apenas admins podem acessar.
+    """
+    from app.tasks.monthly_validation import get_backfill_job
+
+    job = get_backfill_job(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Backfill não encontrado"
+        )
+    return job
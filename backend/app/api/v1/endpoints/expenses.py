@@ -1,13 +1,22 @@
+import csv
+import enum
+import io
+import json
 import logging
-from datetime import date
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, File, HTTPException, status, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.core.deps import get_current_user, require_roles
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor, encode_cursor
 from app.core.permissions import (
     get_expense_scope_params,
     can_access_expense,
@@ -16,7 +25,22 @@ from app.core.permissions import (
 )
 from app.models.user import User, UserRole
 from app.models.expense import ExpenseStatus, ExpenseType
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseWithRelationsResponse, ExpenseCancelRequest
+from app.schemas.expense import (
+    ExpenseCreate,
+    ExpenseUpdate,
+    ExpenseResponse,
+    ExpenseWithRelationsResponse,
+    ExpenseCancelRequest,
+    ExpensePage,
+    ExpenseSummaryResponse,
+    ExpenseListView,
+    ExpenseImportRequest,
+    ExpenseImportResponse,
+    ExpenseImportRowResult,
+    ExpenseBatchFilters,
+    ExpenseBatchRequest,
+    ExpenseBatchResponse,
+)
 from app.services import expense_service, expense_validation_service, exchange_service
 from app.services import category_service, company_service, department_service, user_service
 
@@ -33,25 +57,26 @@ def _normalize_list(value: list | None) -> list | None:
     return value
 
 
-@router.get("", response_model=list[ExpenseWithRelationsResponse])
-def list_expenses(
-    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
-    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
-    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
-    category_ids: list[UUID] | None = Query(None, description="Filtrar por categorias"),
-    status: list[ExpenseStatus] | None = Query(None, description="Filtrar por status"),
-    expense_type: list[ExpenseType] | None = Query(None, description="Filtrar por tipo"),
-    service_name: str | None = Query(None, description="Busca parcial por nome"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Lista despesas com escopo por role (empresa + responsável/created_by)."""
+def _resolve_list_filters(
+    current_user: User,
+    company_ids: list[UUID] | None,
+    department_ids: list[UUID] | None,
+    owner_ids: list[UUID] | None,
+    category_ids: list[UUID] | None,
+    statuses: list[ExpenseStatus] | None,
+    expense_types: list[ExpenseType] | None,
+    service_name: str | None,
+) -> dict | None:
+    """
+    Combina filtros da listagem com o escopo do role.
+    Retorna kwargs para expense_service (expense_filters.apply_filters) ou None se o usuário não tem acesso a nada.
+    """
     company_ids = _normalize_list(company_ids)
     department_ids = _normalize_list(department_ids)
     owner_ids = _normalize_list(owner_ids)
     category_ids = _normalize_list(category_ids)
-    statuses = _normalize_list(status)
-    expense_types = _normalize_list(expense_type)
+    statuses = _normalize_list(statuses)
+    expense_types = _normalize_list(expense_types)
 
     scope = get_expense_scope_params(current_user)
     scope_company_ids = scope["company_ids"]
@@ -60,7 +85,7 @@ def list_expenses(
     scope_department_ids = scope.get("department_ids")
 
     if scope_company_ids is not None and len(scope_company_ids) == 0:
-        return []
+        return None
 
     # Validar filtros contra escopo do usuário
     role_val = _perm_role_value(current_user.role)
@@ -107,18 +132,330 @@ def list_expenses(
         # Se não há filtro do usuário, usar escopo (pode ser None)
         final_department_ids = scope_department_ids
 
-    expenses = expense_service.get_filtered(
-        db,
-        company_ids=final_company_ids,
-        department_ids=final_department_ids,
-        owner_ids=final_owner_ids,
-        created_by_id=scope_created_by_id,
-        category_ids=category_ids,
-        statuses=statuses,
-        expense_types=expense_types,
-        service_name=service_name,
+    return {
+        "company_ids": final_company_ids,
+        "department_ids": final_department_ids,
+        "owner_ids": final_owner_ids,
+        "created_by_id": scope_created_by_id,
+        "category_ids": category_ids,
+        "statuses": statuses,
+        "expense_types": expense_types,
+        "service_name": service_name,
+    }
+
+
+@router.get("", response_model=list[ExpenseWithRelationsResponse] | list[ExpenseSummaryResponse])
+def list_expenses(
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    category_ids: list[UUID] | None = Query(None, description="Filtrar por categorias"),
+    status: list[ExpenseStatus] | None = Query(None, description="Filtrar por status"),
+    expense_type: list[ExpenseType] | None = Query(None, description="Filtrar por tipo"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    view: ExpenseListView = Query("full", description="full = despesa completa; summary = apenas colunas da listagem"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Lista despesas com escopo por role (empresa + responsável/created_by)."""
+    filters = _resolve_list_filters(
+        current_user, company_ids, department_ids, owner_ids,
+        category_ids, status, expense_type, service_name,
+    )
+    if filters is None:
+        return []
+    if view == "summary":
+        return expense_service.get_filtered_summary(db, **filters)
+    return expense_service.get_filtered(db, **filters)
+
+
+@router.get("/page", response_model=ExpensePage)
+def list_expenses_page(
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    category_ids: list[UUID] | None = Query(None, description="Filtrar por categorias"),
+    status_filter: list[ExpenseStatus] | None = Query(None, alias="status", description="Filtrar por status"),
+    expense_type: list[ExpenseType] | None = Query(None, description="Filtrar por tipo"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    cursor: str | None = Query(None, description="Cursor retornado em next_cursor da página anterior"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Itens por página"),
+    include_total: bool = Query(False, description="Incluir total de registros (COUNT adicional)"),
+    view: ExpenseListView = Query("full", description="full = despesa completa; summary = apenas colunas da listagem"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Lista despesas paginadas por cursor (created_at, id), mais recente primeiro.
+    Mesmos filtros e escopo de GET /expenses; o custo por página não cresce com a tabela.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, datetime.fromisoformat, UUID)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+    filters = _resolve_list_filters(
+        current_user, company_ids, department_ids, owner_ids,
+        category_ids, status_filter, expense_type, service_name,
+    )
+    if filters is None:
+        return ExpensePage(items=[], total=0 if include_total else None)
+
+    items, next_key, total = expense_service.get_filtered_page(
+        db, after=after, limit=limit, include_total=include_total,
+        summary=(view == "summary"), **filters
+    )
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(*next_key) if next_key else None,
+        "total": total,
+    }
+
+
+EXPORT_COLUMNS = [
+    "code", "service_name", "description", "expense_type", "category_name", "company_name",
+    "department_name", "owner_name", "value", "currency", "value_brl", "exchange_rate",
+    "periodicity", "renewal_date", "payment_method", "contracted_plan", "user_count",
+    "status", "review_status", "cancellation_month", "created_at",
+]
+
+
+def _export_value(value):
+    """Normaliza valores de exportação (enum -> value, data -> ISO, Decimal -> str)."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _export_stream(filters: dict | None, export_format: str):
+    """
+    Gera o arquivo em blocos a partir de um cursor no servidor.
+    Usa sessão própria: a de get_db já foi fechada quando o streaming começa.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if export_format == "csv":
+        writer.writerow(EXPORT_COLUMNS)
+
+    db = SessionLocal()
+    try:
+        rows = expense_service.iter_export_rows(db, **filters) if filters is not None else iter(())
+        for i, row in enumerate(rows, 1):
+            values = [_export_value(getattr(row, col)) for col in EXPORT_COLUMNS]
+            if export_format == "csv":
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, values)), ensure_ascii=False) + "\n")
+            if i % expense_service.EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+        yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/export")
+def export_expenses(
+    company_ids: list[UUID] | None = Query(None, description="Filtrar por empresas"),
+    department_ids: list[UUID] | None = Query(None, description="Filtrar por setores"),
+    owner_ids: list[UUID] | None = Query(None, description="Filtrar por responsáveis"),
+    category_ids: list[UUID] | None = Query(None, description="Filtrar por categorias"),
+    status_filter: list[ExpenseStatus] | None = Query(None, alias="status", description="Filtrar por status"),
+    expense_type: list[ExpenseType] | None = Query(None, description="Filtrar por tipo"),
+    service_name: str | None = Query(None, description="Busca parcial por nome"),
+    export_format: Literal["csv", "ndjson"] = Query("csv", alias="format", description="Formato do arquivo"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Exporta despesas (CSV ou NDJSON) com os mesmos filtros e escopo de GET /expenses.
+    As linhas são transmitidas conforme lidas do banco (memória constante).
+    """
+    filters = _resolve_list_filters(
+        current_user, company_ids, department_ids, owner_ids,
+        category_ids, status_filter, expense_type, service_name,
+    )
+    media_type = "text/csv; charset=utf-8" if export_format == "csv" else "application/x-ndjson"
+    filename = f"despesas_{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        _export_stream(filters, export_format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _validate_import_rows(
+    raw_rows: list[tuple[int, dict]],
+) -> tuple[list[tuple[int, ExpenseCreate]], list[ExpenseImportRowResult]]:
+    """Valida cada linha contra ExpenseCreate; retorna (linhas válidas, resultados com erro)."""
+    if len(raw_rows) > expense_service.MAX_IMPORT_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Máximo de {expense_service.MAX_IMPORT_ROWS} linhas por importação"
+        )
+    valid = []
+    invalid = []
+    for row_number, raw in raw_rows:
+        try:
+            valid.append((row_number, ExpenseCreate.model_validate(raw)))
+        except ValidationError as e:
+            invalid.append(ExpenseImportRowResult(
+                row=row_number,
+                errors=[f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()],
+            ))
+    return valid, invalid
+
+
+def _run_import(
+    db: Session,
+    raw_rows: list[tuple[int, dict]],
+    current_user: User,
+) -> ExpenseImportResponse:
+    valid, invalid = _validate_import_rows(raw_rows)
+    try:
+        results = expense_service.bulk_create(db, valid, current_user) if valid else []
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=str(e)
+        )
+    except IntegrityError as e:
+        logging.warning("IntegrityError ao importar despesas: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Dados inválidos ou conflito (ex.: setor não pertence à empresa)."
+        )
+    rows = sorted(results + invalid, key=lambda r: r.row)
+    created = sum(1 for r in rows if not r.errors)
+    return ExpenseImportResponse(created=created, failed=len(rows) - created, rows=rows)
+
+
+@router.post("/import", response_model=ExpenseImportResponse)
+def import_expenses(
+    body: ExpenseImportRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Importa despesas em lote (JSON). Linhas inválidas são reportadas e as válidas são criadas
+    em uma única transação, com validação do mês de criação.
+    """
+    return _run_import(db, list(enumerate(body.items, 1)), current_user)
+
+
+@router.post("/import/csv", response_model=ExpenseImportResponse)
+def import_expenses_csv(
+    file: UploadFile = File(..., description="CSV com cabeçalho nos nomes dos campos de ExpenseCreate"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Importa despesas em lote a partir de CSV (UTF-8, separador vírgula).
+    Células vazias são tratadas como ausentes; row = linha do arquivo.
+    """
+    try:
+        content = file.file.read().decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Arquivo deve estar em UTF-8"
+        )
+    reader = csv.DictReader(io.StringIO(content))
+    raw_rows = [
+        (reader.line_num, {k.strip(): v.strip() for k, v in row.items() if k and v and v.strip()})
+        for row in reader
+    ]
+    return _run_import(db, raw_rows, current_user)
+
+
+@router.post("/batch", response_model=ExpenseBatchResponse)
+def batch_expenses(
+    body: ExpenseBatchRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Aplica cancelamento, troca de responsável ou status de revisão a várias despesas
+    em um único UPDATE, restrito ao escopo do usuário. Retorna os ids afetados.
+    """
+    # filters vazio ({} ou só listas vazias) selecionaria todas as despesas do escopo
+    has_filter = body.filters is not None and any(
+        value.strip() if isinstance(value, str) else value
+        for value in body.filters.model_dump().values()
+    )
+    if not body.expense_ids and not has_filter:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Informe expense_ids ou ao menos um filtro"
+        )
+    f = body.filters or ExpenseBatchFilters()
+    filters = _resolve_list_filters(
+        current_user, f.company_ids, f.department_ids, f.owner_ids,
+        f.category_ids, f.status, f.expense_type, f.service_name,
     )
-    return expenses
+    affected: list[UUID] = []
+    if filters is not None:
+        if body.action == "cancel":
+            affected = expense_service.batch_cancel(
+                db,
+                charged_this_month=body.charged_this_month,
+                cancellation_month=body.cancellation_month,
+                cancelled_by_id=current_user.id,
+                expense_ids=body.expense_ids,
+                **filters,
+            )
+        elif body.action == "reassign":
+            owner = user_service.get_by_id(db, body.owner_id) if body.owner_id else None
+            if not owner:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Responsável não encontrado"
+                )
+            affected = expense_service.batch_reassign(db, owner, expense_ids=body.expense_ids, **filters)
+        else:
+            if body.review_status is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Informe review_status"
+                )
+            affected = expense_service.batch_set_review_status(
+                db, body.review_status, expense_ids=body.expense_ids, **filters
+            )
+
+    affected_set = set(affected)
+    skipped = [i for i in (body.expense_ids or []) if i not in affected_set]
+    return ExpenseBatchResponse(
+        action=body.action, count=len(affected), affected_ids=affected, skipped_ids=skipped
+    )
+
+
+@router.post("/revalue-usd", status_code=status.HTTP_200_OK)
+def revalue_usd_expenses(
+    as_of: date | None = Query(None, description="Data da cotação a aplicar (usa o snapshot mais recente até essa data). Padrão: hoje (APP_TIMEZONE)."),
+    dry_run: bool = Query(False, description="Apenas calcula quantas despesas mudariam e a variação total em BRL"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(admin_only)
+):
+    """
+    Recalcula value_brl/exchange_rate das despesas em USD com a cotação histórica
+    de exchange_rates, em um único UPDATE. Apenas admins podem executar.
+    """
+    try:
+        return exchange_service.revalue_usd_expenses(db, as_of=as_of, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
 
 
 @router.get("/{expense_id}", response_model=ExpenseWithRelationsResponse)
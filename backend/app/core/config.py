@@ -1,3 +1,4 @@
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -18,10 +19,49 @@ class Settings(BaseSettings):
 
     # Cotação
     AWESOME_API_URL: str = "https://economia.awesomeapi.com.br/json/last/USD-BRL"
+    FX_CACHE_TTL_SECONDS: int = 900  # cotação em memória considerada fresca por 15 min
+    FX_HTTP_TIMEOUT_SECONDS: float = 5.0
+    FX_BREAKER_FAILURE_THRESHOLD: int = 3  # falhas seguidas até suspender buscas
+    FX_BREAKER_COOLDOWN_SECONDS: int = 300
+    FX_DAILY_REVALUATION: bool = True  # reavaliar despesas em USD após o snapshot diário
 
     # CORS (produção: lista separada por vírgula, ex: "https://subs.nitrofund.com")
     CORS_ORIGINS: str = ""
 
+    # Validações: dias após o início do mês até a validação pendente ficar atrasada
+    VALIDATION_OVERDUE_DAYS: int = 4
+    # Criar alertas VALIDATION_OVERDUE para o responsável ao marcar validações atrasadas
+    VALIDATION_OVERDUE_ALERTS: bool = False
+
+    # Alertas pendentes: tamanho do lote reservado (FOR UPDATE SKIP LOCKED) por transação
+    ALERT_PROCESS_BATCH_SIZE: int = 100
+    # Resumo diário: um alerta por destinatário/dia (renovações + validações pendentes)
+    # em vez de um alerta por despesa
+    ALERT_DIGEST_MODE: bool = False
+
+    # Entrega externa de alertas (worker asyncio). Desligada: alertas são apenas in-app.
+    ALERT_DELIVERY_ENABLED: bool = False
+    ALERT_DELIVERY_BATCH_SIZE: int = 50
+    ALERT_DELIVERY_POLL_SECONDS: float = 5.0
+    ALERT_DELIVERY_MAX_ATTEMPTS: int = Field(default=3, ge=1)
+    ALERT_DELIVERY_BACKOFF_SECONDS: float = 1.0  # dobra a cada nova tentativa
+    ALERT_DELIVERY_EMAIL_CONCURRENCY: int = 5
+    ALERT_DELIVERY_EMAIL_RATE_PER_SECOND: float = 10.0
+
+    # SMTP (canal EMAIL)
+    SMTP_HOST: str = "localhost"
+    SMTP_PORT: int = 1025
+    SMTP_USERNAME: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_FROM: str = "alertas@nitrofund.com.br"
+    SMTP_START_TLS: bool = False
+    SMTP_TIMEOUT_SECONDS: float = 10.0
+
+    # Stream SSE de alertas (GET /alerts/stream)
+    ALERT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    ALERT_STREAM_QUEUE_SIZE: int = 100  # eventos pendentes por conexão antes de descartar
+    ALERT_STREAM_TOKEN_SECONDS: int = 60  # validade do token de uso único em ?token= (só para conectar)
+
     # Timezone para determinação do "mês atual" (validações, dashboard)
     # Padrão: America/Sao_Paulo (Brasil)
     APP_TIMEZONE: str = "America/Sao_Paulo"
@@ -1,12 +1,17 @@
-from fastapi import Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import NamedTuple
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
 
-from app.core.database import get_db
-from app.core.security import decode_access_token
+from app.core.database import SessionLocal, get_db
+from app.core.security import STREAM_TOKEN_SCOPE, decode_access_token
 from app.models.user import User, UserRole
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
 def get_current_user(
@@ -45,6 +50,55 @@ def get_current_user(
     return user
 
 
+class StreamSession(NamedTuple):
+    user_id: UUID
+    expires_at: datetime  # o stream é encerrado quando o token de acesso expira
+
+
+def get_stream_session(
+    token: str | None = Query(None, description="Token de stream (POST /alerts/stream-token)"),
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+) -> StreamSession:
+    """
+    Usuário de conexões longas (SSE): token de acesso no header, ou token de stream curto em
+    ?token= (tokens de acesso não são aceitos na URL, para não irem a logs de proxy).
+    A sessão do banco é aberta só para a verificação, não durante o stream.
+    """
+    if credentials:
+        payload = decode_access_token(credentials.credentials)
+        if payload and payload.get("scope") is not None:
+            payload = None
+        session_exp = payload.get("exp") if payload else None
+    else:
+        payload = decode_access_token(token) if token else None
+        if payload and payload.get("scope") != STREAM_TOKEN_SCOPE:
+            payload = None
+        session_exp = payload.get("session_exp") if payload else None
+    if not payload or session_exp is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token inválido ou expirado",
+        )
+
+    db = SessionLocal()
+    try:
+        user = db.query(User.id, User.is_active).filter(User.id == payload.get("sub")).first()
+    finally:
+        db.close()
+
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Usuário não encontrado",
+        )
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuário inativo",
+        )
+    return StreamSession(user.id, datetime.fromtimestamp(session_exp, timezone.utc))
+
+
 def _role_value(role) -> str:
     """Normaliza role para string (enum ou string do DB)."""
     return role.value if hasattr(role, "value") else str(role)
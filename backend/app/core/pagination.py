@@ -0,0 +1,40 @@
+"""Helpers para paginação por cursor (keyset)."""
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable
+from uuid import UUID
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def _to_json(value: Any) -> Any:
+    """Converte valores da chave de ordenação para tipos serializáveis."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Gera cursor opaco (base64 url-safe) a partir da chave de ordenação da última linha."""
+    payload = json.dumps([_to_json(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple:
+    """
+    Decodifica cursor gerado por encode_cursor.
+    Cada parser converte a posição correspondente (ex.: datetime.fromisoformat, UUID).
+    Levanta ValueError se o cursor for inválido.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValueError("Cursor inválido")
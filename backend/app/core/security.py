@@ -33,4 +33,22 @@ def decode_access_token(token: str) -> dict | None:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
         return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+
+STREAM_TOKEN_SCOPE = "alert_stream"
+
+
+def create_stream_token(user_id: str, session_expires_at: int) -> str:
+    """
+    Token curto e restrito ao stream SSE (pode ir na URL: EventSource não envia headers).
+    session_exp: exp do token de acesso que o emitiu; o stream é encerrado nesse instante.
+    """
+    expire = datetime.now(timezone.utc) + timedelta(seconds=settings.ALERT_STREAM_TOKEN_SECONDS)
+    to_encode = {
+        "sub": user_id,
+        "scope": STREAM_TOKEN_SCOPE,
+        "session_exp": session_expires_at,
+        "exp": expire,
+    }
+    return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
@@ -21,23 +21,38 @@ SCHEDULER_TICK_SECONDS = 60
 VALIDATION_TRIGGER_SLOTS = {(0, 5), (6, 0), (12, 0)}
 _last_validation_slot: tuple[date, int, int] | None = None
 _last_alert_run_ts: float = 0.0
+_last_fx_snapshot_date: date | None = None
 
 
 async def _background_scheduler():
-    """Scheduler em background para validações mensais e alertas de renovação."""
+    """Scheduler em background para validações mensais, alertas de renovação e cotação USD/BRL."""
+    from app.services.exchange_service import usd_brl_rate_provider
+    from app.tasks.exchange_rate_tasks import revalue_usd_expenses_task, snapshot_exchange_rate_task
     from app.tasks.alert_tasks import check_and_create_renewal_alerts_7_3_1
     from app.tasks.monthly_validation import (
         advance_renewal_dates_task,
         create_monthly_validations_task,
     )
 
-    global _last_validation_slot, _last_alert_run_ts
+    global _last_validation_slot, _last_alert_run_ts, _last_fx_snapshot_date
     app_tz = ZoneInfo(settings.APP_TIMEZONE)
 
     while True:
         try:
             now = datetime.now(app_tz)
 
+            # Cotação USD/BRL: renova o cache em background quando o TTL vence
+            usd_brl_rate_provider.refresh_if_stale()
+
+            # Snapshot diário da cotação + reavaliação das despesas em USD
+            if _last_fx_snapshot_date != now.date():
+                result_fx = await asyncio.to_thread(snapshot_exchange_rate_task)
+                if result_fx.get("success"):
+                    _last_fx_snapshot_date = now.date()
+                    if settings.FX_DAILY_REVALUATION:
+                        result_revaluation = await asyncio.to_thread(revalue_usd_expenses_task)
+                        logger.info("Reavaliação de despesas em USD: %s", result_revaluation)
+
             # Dia 1: criar validações em horários de segurança
             if now.day == 1 and (now.hour, now.minute) in VALIDATION_TRIGGER_SLOTS:
                 current_slot = (now.date(), now.hour, now.minute)
@@ -63,15 +78,29 @@ async def _background_scheduler():
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Gerencia tarefas em background durante o ciclo de vida da aplicação."""
-    from app.tasks.monthly_validation import create_monthly_validations_task
+    from app.services.exchange_service import usd_brl_rate_provider
+    from app.tasks.monthly_validation import catch_up_validations_task
+
+    # Aquece o cache da cotação USD/BRL (falha não impede o startup).
+    await asyncio.to_thread(usd_brl_rate_provider.refresh)
 
-    # Catch-up no startup para garantir validações do mês atual.
-    startup_result = await asyncio.to_thread(create_monthly_validations_task)
+    # Catch-up no startup: validações do mês atual e de meses perdidos desde a última geração.
+    startup_result = await asyncio.to_thread(catch_up_validations_task)
     logger.info("Validações mensais (startup catch-up): %s", startup_result)
 
     task = asyncio.create_task(_background_scheduler())
     logger.info("Scheduler de background iniciado")
+    # LISTEN/NOTIFY de novos alertas para o stream SSE (reconecta sozinho em caso de falha)
+    from app.services.alert_stream import alert_broadcaster
+    alert_broadcaster.start()
+    if settings.ALERT_DELIVERY_ENABLED:
+        from app.services.alert_delivery import alert_delivery_worker
+        alert_delivery_worker.start()
+        logger.info("Worker de entrega de alertas iniciado")
     yield
+    alert_broadcaster.stop()
+    if settings.ALERT_DELIVERY_ENABLED:
+        await alert_delivery_worker.stop()
     task.cancel()
     try:
         await task
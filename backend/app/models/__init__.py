@@ -8,6 +8,8 @@ from app.models.user import User, UserRole
 from app.models.expense import Expense, ExpenseType, Currency, Periodicity, PaymentMethod, ExpenseStatus
 from app.models.expense_validation import ExpenseValidation, ValidationStatus
 from app.models.alert import Alert, AlertType, AlertStatus, AlertChannel
+from app.models.alert_unread_counter import AlertUnreadCounter
+from app.models.exchange_rate import ExchangeRate
 
 __all__ = [
     "BaseModel",
@@ -31,4 +33,6 @@ __all__ = [
     "AlertType",
     "AlertStatus",
     "AlertChannel",
+    "AlertUnreadCounter",
+    "ExchangeRate",
 ]
\ No newline at end of file
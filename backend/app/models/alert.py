@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Enum, ForeignKey, String, Text, Boolean, DateTime, Index
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, Enum, ForeignKey, String, Text, Boolean, DateTime, Index, Integer, text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import relationship
 import enum
 
@@ -13,6 +13,7 @@ class AlertType(str, enum.Enum):
     RENEWAL_UPCOMING = "renewal_upcoming"  # Renovação próxima
     RENEWAL_DUE = "renewal_due"  # Renovação vencendo hoje
     EXPENSE_CANCELLATION = "expense_cancellation"  # Cancelamento de despesa
+    DAILY_DIGEST = "daily_digest"  # Resumo diário por destinatário (ALERT_DIGEST_MODE)
 
 
 class AlertStatus(str, enum.Enum):
@@ -55,6 +56,13 @@ class Alert(Base, BaseModel):
     sent_at = Column(DateTime(timezone=True), nullable=True)
     read_at = Column(DateTime(timezone=True), nullable=True)
     error_message = Column(Text, nullable=True)  # Mensagem de erro se falhar
+
+    # Deduplicação (ex.: renovação: "renewal:{expense_id}:{renewal_date}:{days_before}")
+    days_before = Column(Integer, nullable=True)  # Dias antes do evento (alertas de renovação)
+    dedup_key = Column(String(255), nullable=True)
+
+    # Dados estruturados (ex.: itens do resumo diário)
+    payload = Column(JSONB(none_as_null=True), nullable=True)
     
     # Relacionamentos ORM
     recipient = relationship("User", foreign_keys=[recipient_id])
@@ -66,4 +74,5 @@ class Alert(Base, BaseModel):
         Index('idx_alert_recipient_status', 'recipient_id', 'status'),
         Index('idx_alert_type_status', 'alert_type', 'status'),
         Index('idx_alert_expense', 'expense_id'),
+        Index('uq_alert_dedup_key', 'dedup_key', unique=True, postgresql_where=text('dedup_key IS NOT NULL')),
     )
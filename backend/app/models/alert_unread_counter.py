@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.core.database import Base
+
+
+class AlertUnreadCounter(Base):
+    """
+    Alertas não lidos (PENDING/SENT) por usuário. Mantido por triggers na tabela alerts
+    (migration s1t2u3v4w5x6); a aplicação só lê.
+    """
+    __tablename__ = "alert_unread_counters"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, String, Numeric, Date, DateTime, UniqueConstraint
+
+from app.core.database import Base
+from app.models.base import BaseModel
+
+
+class ExchangeRate(Base, BaseModel):
+    """Cotação diária por par de moedas (última obtida no dia); também é o last-known-good."""
+    __tablename__ = "exchange_rates"
+
+    base_currency = Column(String(3), nullable=False)  # ex.: USD
+    quote_currency = Column(String(3), nullable=False)  # ex.: BRL
+    rate = Column(Numeric(10, 4), nullable=False)
+    rate_date = Column(Date, nullable=False)  # Dia da cotação
+    fetched_at = Column(DateTime(timezone=True), nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint('base_currency', 'quote_currency', 'rate_date', name='uq_exchange_rate_pair_date'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Numeric, Date, DateTime, Integer
+from sqlalchemy import Column, String, Boolean, Enum, ForeignKey, Numeric, Date, DateTime, Integer, Index, Sequence
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 import enum
@@ -47,6 +47,10 @@ class ReviewStatus(str, enum.Enum):
     REVIEW = "review"
 
 
+# Numeração dos códigos DPnn (seed na migration m5n6o7p8q9r0)
+expense_code_seq = Sequence("expense_code_seq", metadata=Base.metadata)
+
+
 class Expense(Base, BaseModel):
     __tablename__ = "expenses"
 
@@ -123,4 +127,9 @@ class Expense(Base, BaseModel):
     approver = relationship("User", foreign_keys=[approver_id])
     created_by = relationship("User", foreign_keys=[created_by_id])
     cancelled_by = relationship("User", foreign_keys=[cancelled_by_id])
-    validations = relationship("ExpenseValidation", back_populates="expense")
\ No newline at end of file
+    validations = relationship("ExpenseValidation", back_populates="expense")
+
+    # Índices
+    __table_args__ = (
+        Index('idx_expense_created_at_id', 'created_at', 'id'),  # Paginação por cursor
+    )
@@ -36,4 +36,5 @@ class ExpenseValidation(Base, BaseModel):
         UniqueConstraint('expense_id', 'validation_month', name='uq_expense_validation_month'),
         Index('idx_expense_validation_expense_month', 'expense_id', 'validation_month'),
         Index('idx_expense_validation_validator_status', 'validator_id', 'status'),
+        Index('idx_expense_validation_month_created_id', 'validation_month', 'created_at', 'id'),
     )
@@ -9,6 +9,20 @@ from pydantic import BaseModel
 from app.models.alert import AlertType, AlertStatus, AlertChannel
 
 
+class AlertCreate(BaseModel):
+    """Especificação de alerta para criação em lote (alert_service.create_alerts)"""
+    alert_type: AlertType
+    title: str
+    message: str
+    recipient_id: UUID
+    expense_id: UUID | None = None
+    validation_id: UUID | None = None
+    channel: AlertChannel = AlertChannel.EMAIL
+    days_before: int | None = None
+    dedup_key: str | None = None  # Alertas com a mesma chave são criados uma única vez
+    payload: dict | None = None
+
+
 class AlertResponse(BaseModel):
     """Schema de resposta de alerta"""
     id: UUID
@@ -23,6 +37,8 @@ class AlertResponse(BaseModel):
     sent_at: datetime | None
     read_at: datetime | None
     error_message: str | None
+    days_before: int | None = None
+    payload: dict | None = None
     created_at: datetime
     updated_at: datetime | None
 
@@ -66,3 +82,8 @@ class AlertStatsResponse(BaseModel):
     sent: int
     failed: int
     read: int
+
+
+class AlertUnreadCountResponse(BaseModel):
+    """Schema de contagem de alertas não lidos do usuário"""
+    unread_count: int
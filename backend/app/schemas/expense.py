@@ -1,6 +1,7 @@
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
+from typing import Any, Literal
 
 from pydantic import BaseModel, ConfigDict
 
@@ -8,6 +9,10 @@ from app.models.expense import ExpenseType, Currency, Periodicity, PaymentMethod
 from app.models.expense_validation import ValidationStatus
 
 
+# Modo de listagem: full = ExpenseWithRelationsResponse; summary = ExpenseSummaryResponse
+ExpenseListView = Literal["full", "summary"]
+
+
 class ExpenseCreate(BaseModel):
     service_name: str
     description: str | None = None
@@ -31,6 +36,57 @@ class ExpenseCreate(BaseModel):
     notes: str | None = None
 
 
+class ExpenseImportRequest(BaseModel):
+    """Importação em lote (JSON). Cada item segue o formato de ExpenseCreate; erros são reportados por linha."""
+    items: list[dict[str, Any]]
+
+
+class ExpenseImportRowResult(BaseModel):
+    """Resultado por linha da importação (row = posição do item no JSON ou linha do CSV)."""
+    row: int
+    id: UUID | None = None
+    code: str | None = None
+    errors: list[str] = []
+
+
+class ExpenseImportResponse(BaseModel):
+    created: int
+    failed: int
+    rows: list[ExpenseImportRowResult]
+
+
+class ExpenseBatchFilters(BaseModel):
+    """Mesmos filtros de GET /expenses, para selecionar despesas de uma operação em lote."""
+    company_ids: list[UUID] | None = None
+    department_ids: list[UUID] | None = None
+    owner_ids: list[UUID] | None = None
+    category_ids: list[UUID] | None = None
+    status: list[ExpenseStatus] | None = None
+    expense_type: list[ExpenseType] | None = None
+    service_name: str | None = None
+
+
+class ExpenseBatchRequest(BaseModel):
+    """
+    Operação em lote: cancel, reassign (owner_id) ou review_status.
+    Seleção por expense_ids e/ou filters (ids ou ao menos um filtro não vazio; senão 422).
+    """
+    action: Literal["cancel", "reassign", "review_status"]
+    expense_ids: list[UUID] | None = None
+    filters: ExpenseBatchFilters | None = None
+    charged_this_month: bool = False  # cancel
+    cancellation_month: date | None = None  # cancel (padrão: mês atual)
+    owner_id: UUID | None = None  # reassign
+    review_status: ReviewStatus | None = None  # review_status
+
+
+class ExpenseBatchResponse(BaseModel):
+    action: str
+    count: int
+    affected_ids: list[UUID]
+    skipped_ids: list[UUID] = []  # ids pedidos mas fora do escopo ou já no estado final
+
+
 class ExpenseCancelRequest(BaseModel):
     """Payload para cancelar despesa com informação se já foi processada no mês"""
     charged_this_month: bool
@@ -155,4 +211,36 @@ class UserBasic(BaseModel):
     email: str
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ExpenseSummaryResponse(BaseModel):
+    """Linha enxuta para listagens (view=summary): sem login, notas, evidência etc."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    code: str
+    service_name: str
+    expense_type: ExpenseType
+    value: Decimal
+    currency: Currency
+    value_brl: Decimal
+    periodicity: Periodicity | None
+    renewal_date: date | None
+    status: ExpenseStatus
+    review_status: ReviewStatus
+    category_id: UUID
+    category_name: str
+    company_id: UUID
+    company_name: str
+    department_id: UUID
+    department_name: str
+    owner_id: UUID
+    owner_name: str
+    created_at: datetime
+
+
+class ExpensePage(BaseModel):
+    """Página de despesas (paginação por cursor)."""
+    items: list[ExpenseWithRelationsResponse] | list[ExpenseSummaryResponse]
+    next_cursor: str | None = None  # None = última página
+    total: int | None = None  # Preenchido apenas com include_total=true
@@ -1,9 +1,9 @@
 from uuid import UUID
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.models.expense_validation import ValidationStatus
 
@@ -25,6 +25,30 @@ class RejectRequest(BaseModel):
     charged_this_month: bool = False
 
 
+MAX_BULK_DECISION_ITEMS = 500
+
+
+class BulkDecisionRequest(BaseModel):
+    """Aprovação/rejeição em lote de validações"""
+    validation_ids: list[UUID] = Field(..., min_length=1, max_length=MAX_BULK_DECISION_ITEMS)
+    decision: Literal["approve", "reject"]
+    charged_this_month: bool = False  # reject: se a despesa já foi processada no mês
+
+
+BulkDecisionOutcome = Literal["approved", "rejected", "not_found", "forbidden", "already_processed"]
+
+
+class BulkDecisionResult(BaseModel):
+    id: UUID
+    outcome: BulkDecisionOutcome
+
+
+class BulkDecisionResponse(BaseModel):
+    decision: str
+    processed: int  # quantas validações mudaram de status
+    results: list[BulkDecisionResult]
+
+
 class ExpenseValidationResponse(BaseModel):
     """Schema básico de resposta de validação"""
     id: UUID | None = None  # Opcional para validações previstas
@@ -97,3 +121,51 @@ class ExpenseValidationWithExpenseResponse(ExpenseValidationResponse):
 
     class Config:
         from_attributes = True
+
+
+class ValidationStatusCounts(BaseModel):
+    """Contagens de validações por situação (overdue = pendentes atrasadas)"""
+    pending: int
+    overdue: int
+    approved: int
+    rejected: int
+    total: int
+
+
+class FacetCount(BaseModel):
+    value: str  # status ou id da entidade
+    label: str | None = None
+    count: int
+
+
+class ValidationFacets(BaseModel):
+    """Contagens do conjunto filtrado (todas as páginas) por dimensão"""
+    status: list[FacetCount] = []
+    company: list[FacetCount] = []
+    department: list[FacetCount] = []
+    owner: list[FacetCount] = []
+
+
+class ExpenseValidationPage(BaseModel):
+    """Página de validações (paginação por cursor)"""
+    items: list[ExpenseValidationWithExpenseResponse]
+    next_cursor: str | None = None  # None = última página
+    total: int | None = None  # Preenchido apenas com include_total=true
+    facets: ValidationFacets | None = None  # Preenchido apenas com include_facets=true
+
+
+class BackfillJobResponse(BaseModel):
+    """Progresso de um backfill de validações"""
+    id: str
+    status: Literal["pending", "running", "completed", "failed"]
+    month_from: date
+    month_to: date
+    chunk_months: int
+    months_total: int
+    months_done: int
+    validations_created: int
+    current_month: date | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    elapsed_seconds: float = 0.0
+    error: str | None = None
@@ -0,0 +1,326 @@
+"""
+Entrega externa de alertas por um worker asyncio (fora do caminho das requisições).
+
+- Canais plugáveis: cada AlertChannel tem um AlertSender (EMAIL: SMTP via aiosmtplib).
+- Por canal: limite de envios simultâneos (semáforo) e rate limit (token bucket).
+- Falhas transitórias são repetidas com backoff exponencial; esgotadas as tentativas,
+  o alerta vai para FAILED com o motivo em error_message.
+- Lotes reservados com FOR UPDATE SKIP LOCKED: vários processos podem entregar em paralelo.
+  Os locks (e a transação) ficam abertos durante os envios do lote: no pior caso por
+  ALERT_DELIVERY_MAX_ATTEMPTS × SMTP_TIMEOUT_SECONDS + backoff total
+  (ALERT_DELIVERY_BACKOFF_SECONDS × (2^(tentativas-1) - 1)) + espera no rate limit; com os
+  padrões, ~33s mais a fila do token bucket. Outros UPDATEs nesses alertas (ex.: marcar
+  como lido) esperam esse tempo. Mantenha lotes e timeouts pequenos.
+
+Para testar localmente sem servidor real: python -m aiosmtpd -n -l localhost:1025
+(SMTP_HOST=localhost, SMTP_PORT=1025) imprime os e-mails recebidos no terminal.
+"""
+import asyncio
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from uuid import UUID
+
+import aiosmtplib
+from sqlalchemy import Text, case, cast, column, select, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.alert import Alert, AlertChannel, AlertStatus
+from app.models.user import User
+from app.services.alert_service import RECIPIENT_INACTIVE_ERROR
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryError(Exception):
+    """Falha de entrega. retryable=False: erro definitivo (não adianta repetir)."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class OutboundAlert:
+    id: UUID
+    channel: AlertChannel
+    title: str
+    message: str
+    recipient_name: str | None
+    recipient_email: str | None
+    recipient_phone: str | None
+    recipient_active: bool | None  # None: destinatário não encontrado
+
+
+class AlertSender:
+    """Canal de entrega. Implementações levantam DeliveryError em caso de falha."""
+
+    async def send(self, alert: OutboundAlert) -> None:
+        raise NotImplementedError
+
+
+class SmtpEmailSender(AlertSender):
+    """Envio por e-mail em qualquer servidor SMTP (configuração SMTP_*)."""
+
+    async def send(self, alert: OutboundAlert) -> None:
+        if not alert.recipient_email:
+            raise DeliveryError("Destinatário sem e-mail cadastrado", retryable=False)
+        message = EmailMessage()
+        message["From"] = settings.SMTP_FROM
+        message["To"] = alert.recipient_email
+        message["Subject"] = alert.title
+        message.set_content(alert.message)
+        try:
+            await aiosmtplib.send(
+                message,
+                hostname=settings.SMTP_HOST,
+                port=settings.SMTP_PORT,
+                username=settings.SMTP_USERNAME or None,
+                password=settings.SMTP_PASSWORD or None,
+                start_tls=settings.SMTP_START_TLS,
+                timeout=settings.SMTP_TIMEOUT_SECONDS,
+            )
+        except aiosmtplib.SMTPRecipientsRefused as e:
+            raise DeliveryError(f"Destinatário recusado pelo servidor SMTP: {e}", retryable=False)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            raise DeliveryError(f"Erro SMTP: {e}")
+
+
+class TokenBucket:
+    """Rate limit: em média `rate` envios por segundo, com rajadas de até `capacity`."""
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class DeliveryMetrics:
+    """Contadores de entrega desde o início do worker (por canal)."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.batches = 0
+        self.retries = 0
+        self.sent: Counter[str] = Counter()
+        self.failed: Counter[str] = Counter()
+        self._send_seconds = 0.0
+
+    def record_sent(self, channel: AlertChannel, seconds: float) -> None:
+        self.sent[channel.value] += 1
+        self._send_seconds += seconds
+
+    def record_failed(self, channel: AlertChannel) -> None:
+        self.failed[channel.value] += 1
+
+    def snapshot(self) -> dict:
+        uptime = time.monotonic() - self.started_at
+        sent_total = sum(self.sent.values())
+        return {
+            "uptime_seconds": round(uptime, 1),
+            "batches": self.batches,
+            "sent": dict(self.sent),
+            "failed": dict(self.failed),
+            "retries": self.retries,
+            "throughput_per_second": round(sent_total / uptime, 3) if uptime > 0 else 0.0,
+            "avg_send_ms": round(self._send_seconds / sent_total * 1000, 1) if sent_total else None,
+        }
+
+
+def _claim_outbound_alerts(db: Session, limit: int) -> list[OutboundAlert]:
+    """
+    Reserva até `limit` alertas pendentes com FOR UPDATE SKIP LOCKED, já com o destinatário.
+    Os locks ficam com a transação até _finish_outbound_alerts (commit).
+    """
+    rows = db.execute(
+        select(
+            Alert.id, Alert.channel, Alert.title, Alert.message,
+            User.name, User.email, User.phone, User.is_active,
+        )
+        .outerjoin(User, User.id == Alert.recipient_id)
+        .where(Alert.status == AlertStatus.PENDING)
+        .order_by(Alert.created_at.asc())
+        .limit(limit)
+        .with_for_update(of=Alert, skip_locked=True)
+    ).all()
+    return [OutboundAlert(*row) for row in rows]
+
+
+def _finish_outbound_alerts(db: Session, outcomes: list[tuple[UUID, str | None]]) -> None:
+    """Grava o resultado do lote em um UPDATE ... FROM (VALUES ...): erro NULL = SENT, senão FAILED."""
+    now = datetime.now(timezone.utc)
+    outcome = values(
+        column("alert_id", PG_UUID(as_uuid=True)), column("error_message", Text), name="outcome"
+    ).data(outcomes)
+    delivered = outcome.c.error_message.is_(None)
+    db.execute(
+        update(Alert)
+        .where(Alert.id == outcome.c.alert_id)
+        .values(
+            status=case(
+                (delivered, cast(AlertStatus.SENT, Alert.status.type)),
+                else_=cast(AlertStatus.FAILED, Alert.status.type),
+            ),
+            sent_at=case((delivered, now), else_=None),
+            error_message=outcome.c.error_message,
+            updated_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+class AlertDeliveryWorker:
+    """
+    Worker asyncio que drena alertas PENDING em lotes e os entrega pelos canais registrados.
+    Acesso ao banco via asyncio.to_thread; envios concorrentes no event loop.
+    """
+
+    def __init__(
+        self,
+        batch_size: int,
+        poll_seconds: float,
+        max_attempts: int,
+        backoff_seconds: float,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts deve ser >= 1")
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.metrics = DeliveryMetrics()
+        self._senders: dict[AlertChannel, AlertSender] = {}
+        self._semaphores: dict[AlertChannel, asyncio.Semaphore] = {}
+        self._buckets: dict[AlertChannel, TokenBucket] = {}
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+
+    def register(self, channel: AlertChannel, sender: AlertSender, concurrency: int, rate_per_second: float) -> None:
+        """Registra (ou substitui) o sender de um canal com seus limites."""
+        self._senders[channel] = sender
+        self._semaphores[channel] = asyncio.Semaphore(concurrency)
+        self._buckets[channel] = TokenBucket(rate_per_second)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.metrics = DeliveryMetrics()
+        self._task = asyncio.create_task(self._run(), name="alert-delivery")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        """Antecipa a próxima busca de pendentes. Pode ser chamado de qualquer thread."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                processed = await self.drain_once()
+            except Exception:
+                logger.exception("Erro no worker de entrega de alertas")
+                processed = 0
+            if processed < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    async def drain_once(self) -> int:
+        """
+        Reserva, entrega e finaliza um lote. Retorna o número de alertas processados.
+        Os alertas do lote ficam travados até o commit final (limite no docstring do módulo).
+        """
+        db = SessionLocal()
+        try:
+            batch = await asyncio.to_thread(_claim_outbound_alerts, db, self.batch_size)
+            if not batch:
+                return 0
+            outcomes = await asyncio.gather(*(self._deliver(alert) for alert in batch))
+            await asyncio.to_thread(_finish_outbound_alerts, db, outcomes)
+            self.metrics.batches += 1
+            return len(batch)
+        finally:
+            await asyncio.to_thread(db.close)
+
+    async def _deliver(self, alert: OutboundAlert) -> tuple[UUID, str | None]:
+        """Entrega um alerta com retries. Retorna (id, None) se enviado, ou (id, motivo da falha)."""
+        if not alert.recipient_active:
+            self.metrics.record_failed(alert.channel)
+            return alert.id, RECIPIENT_INACTIVE_ERROR
+        sender = self._senders.get(alert.channel)
+        if sender is None:
+            self.metrics.record_failed(alert.channel)
+            return alert.id, f"Canal {alert.channel.value} sem provedor de entrega configurado"
+
+        for attempt in range(1, self.max_attempts + 1):
+            await self._buckets[alert.channel].acquire()
+            async with self._semaphores[alert.channel]:
+                started = time.monotonic()
+                try:
+                    await sender.send(alert)
+                except DeliveryError as e:
+                    error = e
+                except Exception as e:
+                    error = DeliveryError(str(e))
+                else:
+                    self.metrics.record_sent(alert.channel, time.monotonic() - started)
+                    return alert.id, None
+            if not error.retryable or attempt == self.max_attempts:
+                break
+            self.metrics.retries += 1
+            await asyncio.sleep(self.backoff_seconds * 2 ** (attempt - 1))
+
+        self.metrics.record_failed(alert.channel)
+        return alert.id, f"{error} (tentativas: {attempt})"
+
+
+alert_delivery_worker = AlertDeliveryWorker(
+    batch_size=settings.ALERT_DELIVERY_BATCH_SIZE,
+    poll_seconds=settings.ALERT_DELIVERY_POLL_SECONDS,
+    max_attempts=settings.ALERT_DELIVERY_MAX_ATTEMPTS,
+    backoff_seconds=settings.ALERT_DELIVERY_BACKOFF_SECONDS,
+)
+alert_delivery_worker.register(
+    AlertChannel.EMAIL,
+    SmtpEmailSender(),
+    concurrency=settings.ALERT_DELIVERY_EMAIL_CONCURRENCY,
+    rate_per_second=settings.ALERT_DELIVERY_EMAIL_RATE_PER_SECOND,
+)
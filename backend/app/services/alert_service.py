@@ -1,14 +1,23 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from datetime import datetime, timezone, timedelta, date
 from typing import Optional
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, case, cast, func, literal, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
+from app.core.config import settings
 from app.models.alert import Alert, AlertType, AlertStatus, AlertChannel
+from app.models.alert_unread_counter import AlertUnreadCounter
+from app.models.department import Department
 from app.models.user import User
 from app.models.expense import Expense, ExpenseStatus
 from app.models.expense_validation import ExpenseValidation, ValidationStatus
+from app.schemas.alert import AlertCreate
+
+RECIPIENT_INACTIVE_ERROR = "Destinatário não encontrado ou inativo"
+# Alertas que contam como não lidos (mesma regra dos triggers de alert_unread_counters)
+UNREAD_STATUSES = (AlertStatus.PENDING, AlertStatus.SENT)
 
 
 def create_alert(
@@ -43,6 +52,59 @@ def create_alert(
     return alert
 
 
+def create_alerts(
+    db: Session,
+    specs: list[AlertCreate],
+    send_immediately: Optional[bool] = None,
+    commit: bool = True,
+) -> list[UUID]:
+    """
+    Cria alertas em lote: destinatários resolvidos em uma consulta e um único INSERT.
+    Com send_immediately (alertas in-app), já nascem SENT, ou FAILED se o destinatário
+    não existe/está inativo; sem ele, ficam PENDING para process_pending_alerts ou para o
+    worker de entrega. Padrão: imediato, exceto com ALERT_DELIVERY_ENABLED.
+    Alertas com dedup_key já existente são ignorados (ON CONFLICT DO NOTHING).
+    commit=False: participa da transação do chamador.
+    Retorna os ids criados.
+    """
+    if not specs:
+        return []
+    if send_immediately is None:
+        send_immediately = not settings.ALERT_DELIVERY_ENABLED
+    recipient_ids = {spec.recipient_id for spec in specs}
+    active_ids = set(db.scalars(
+        select(User.id).where(User.id.in_(recipient_ids), User.is_active == True)
+    ))
+
+    now = datetime.now(timezone.utc)
+    rows = []
+    for spec in specs:
+        row = {
+            "id": uuid4(),
+            **spec.model_dump(),
+            "status": AlertStatus.PENDING,
+            "sent_at": None,
+            "error_message": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        if send_immediately:
+            if spec.recipient_id in active_ids:
+                row.update(status=AlertStatus.SENT, sent_at=now)
+            else:
+                row.update(status=AlertStatus.FAILED, error_message=RECIPIENT_INACTIVE_ERROR)
+        rows.append(row)
+
+    stmt = pg_insert(Alert).values(rows).on_conflict_do_nothing(
+        index_elements=[Alert.dedup_key],
+        index_where=Alert.dedup_key.isnot(None),
+    ).returning(Alert.id)
+    ids = list(db.execute(stmt).scalars())
+    if commit:
+        db.commit()
+    return ids
+
+
 def send_alert(db: Session, alert_id: UUID) -> Alert:
     """
     Marca o alerta como enviado (disponível no app).
@@ -60,7 +122,7 @@ def send_alert(db: Session, alert_id: UUID) -> Alert:
     
     if not recipient or not recipient.is_active:
         alert.status = AlertStatus.FAILED
-        alert.error_message = "Destinatário não encontrado ou inativo"
+        alert.error_message = RECIPIENT_INACTIVE_ERROR
         alert.updated_at = datetime.now(timezone.utc)
         db.commit()
         return alert
@@ -84,31 +146,25 @@ def create_and_send_alert(
     expense_id: Optional[UUID] = None,
     validation_id: Optional[UUID] = None,
     channel: AlertChannel = AlertChannel.EMAIL,
-    send_immediately: bool = True
+    send_immediately: Optional[bool] = None
 ) -> Alert:
     """
-    Cria e opcionalmente envia um alerta.
+    Cria e opcionalmente envia um alerta (via create_alerts: um INSERT e um commit).
     """
-    alert = create_alert(
-        db=db,
-        alert_type=alert_type,
-        title=title,
-        message=message,
-        recipient_id=recipient_id,
-        expense_id=expense_id,
-        validation_id=validation_id,
-        channel=channel
+    ids = create_alerts(
+        db,
+        [AlertCreate(
+            alert_type=alert_type,
+            title=title,
+            message=message,
+            recipient_id=recipient_id,
+            expense_id=expense_id,
+            validation_id=validation_id,
+            channel=channel,
+        )],
+        send_immediately=send_immediately,
     )
-    
-    if send_immediately:
-        try:
-            alert = send_alert(db, alert.id)
-        except Exception as e:
-            # Log do erro mas não falha a criação do alerta
-            alert.error_message = str(e)
-            db.commit()
-    
-    return alert
+    return db.get(Alert, ids[0])
 
 
 def get_pending_alerts(db: Session, limit: int = 100) -> list[Alert]:
@@ -133,6 +189,24 @@ def get_alerts_by_recipient(
     return query.order_by(Alert.created_at.desc()).limit(limit).all()
 
 
+def get_alert_stats(db: Session) -> dict:
+    """Total e contagem por status em um único GROUP BY status."""
+    counts = dict(
+        db.query(Alert.status, func.count(Alert.id)).group_by(Alert.status).all()
+    )
+    stats = {status.value: counts.get(status, 0) for status in AlertStatus}
+    stats["total"] = sum(counts.values())
+    return stats
+
+
+def get_unread_count(db: Session, user_id: UUID) -> int:
+    """Alertas não lidos do usuário, lidos de alert_unread_counters (consulta por chave primária)."""
+    count = db.query(AlertUnreadCounter.unread_count).filter(
+        AlertUnreadCounter.user_id == user_id
+    ).scalar()
+    return count or 0
+
+
 def mark_as_read(db: Session, alert_id: UUID) -> Alert:
     """Marca alerta como lido"""
     alert = db.query(Alert).filter(Alert.id == alert_id).first()
@@ -185,6 +259,55 @@ def create_validation_overdue_alert(
     )
 
 
+def create_validation_overdue_alerts(db: Session, validation_ids: list[UUID]) -> int:
+    """
+    Versão em lote de create_validation_overdue_alert: alerta o responsável (owner) de cada
+    despesa, com uma consulta e um INSERT. Alertas são in-app, então já nascem SENT.
+    Não faz commit (participa da transação do chamador). Retorna o número de alertas criados.
+    """
+    if not validation_ids:
+        return 0
+    rows = db.execute(
+        select(
+            ExpenseValidation.id.label("validation_id"),
+            ExpenseValidation.validation_month,
+            Expense.id.label("expense_id"),
+            Expense.service_name,
+            Expense.value_brl,
+            Department.name.label("department_name"),
+            User.id.label("recipient_id"),
+            User.name.label("recipient_name"),
+        )
+        .join(Expense, Expense.id == ExpenseValidation.expense_id)
+        .join(User, User.id == Expense.owner_id)
+        .outerjoin(Department, Department.id == Expense.department_id)
+        .where(ExpenseValidation.id.in_(validation_ids), User.is_active == True)
+    ).all()
+    if not rows:
+        return 0
+
+    specs = [
+        AlertCreate(
+            alert_type=AlertType.VALIDATION_OVERDUE,
+            title="Validação de Despesa Vencida",
+            message=(
+                f"⚠️ *Validação Vencida*\n\n"
+                f"Olá {row.recipient_name},\n\n"
+                f"A validação da despesa *{row.service_name}* está vencida.\n"
+                f"Por favor, acesse o sistema para validar.\n\n"
+                f"Valor: R$ {row.value_brl:.2f}\n"
+                f"Setor: {row.department_name or 'N/A'}\n"
+                f"Mês de referência: {row.validation_month.strftime('%m/%Y')}"
+            ),
+            recipient_id=row.recipient_id,
+            expense_id=row.expense_id,
+            validation_id=row.validation_id,
+        )
+        for row in rows
+    ]
+    return len(create_alerts(db, specs, commit=False))
+
+
 def create_renewal_upcoming_alert(
     db: Session,
     expense: Expense,
@@ -218,6 +341,130 @@ def create_renewal_upcoming_alert(
     )
 
 
+def renewal_dedup_key(expense_id: UUID, renewal_date: date, days_before: int) -> str:
+    """Chave de deduplicação de alerta de renovação: um por despesa, data de renovação e nº de dias."""
+    return f"renewal:{expense_id}:{renewal_date.isoformat()}:{days_before}"
+
+
+def create_renewal_upcoming_alerts(db: Session, candidates: list) -> list[UUID]:
+    """
+    Versão em lote de create_renewal_upcoming_alert. candidates: linhas com expense_id,
+    service_name, value_brl, renewal_date, contracted_plan, days_before, owner_id e owner_name.
+    Usa create_alerts (um INSERT, um commit); duplicados pela dedup_key são ignorados.
+    Retorna os ids criados.
+    """
+    specs = [
+        AlertCreate(
+            alert_type=AlertType.RENEWAL_UPCOMING,
+            title=f"Renovação em {c.days_before} dias",
+            message=(
+                f"📅 *Renovação Próxima*\n\n"
+                f"Olá {c.owner_name},\n\n"
+                f"A despesa *{c.service_name}* será renovada em *{c.days_before} dias*.\n\n"
+                f"Valor: R$ {c.value_brl:.2f}\n"
+                f"Data de renovação: {c.renewal_date.strftime('%d/%m/%Y')}\n"
+                f"Plano: {c.contracted_plan or 'N/A'}"
+            ),
+            recipient_id=c.owner_id,
+            expense_id=c.expense_id,
+            days_before=c.days_before,
+            dedup_key=renewal_dedup_key(c.expense_id, c.renewal_date, c.days_before),
+        )
+        for c in candidates
+    ]
+    return create_alerts(db, specs)
+
+
+DIGEST_MESSAGE_MAX_ITEMS = 10  # Itens listados por seção no texto do resumo (payload traz todos)
+
+
+def _digest_section(title: str, lines: list[str]) -> str:
+    shown = lines[:DIGEST_MESSAGE_MAX_ITEMS]
+    if len(lines) > len(shown):
+        shown.append(f"… e mais {len(lines) - len(shown)}")
+    return f"*{title} ({len(lines)}):*\n" + "\n".join(f"• {line}" for line in shown)
+
+
+def create_daily_digest_alerts(
+    db: Session,
+    digest_date: date,
+    renewals: list,
+    pending_validations: list,
+) -> list[UUID]:
+    """
+    Um alerta DAILY_DIGEST por destinatário e dia, agrupando renovações próximas e
+    validações pendentes; o payload lista todos os itens (o texto, até DIGEST_MESSAGE_MAX_ITEMS).
+    renewals: linhas como em create_renewal_upcoming_alerts.
+    pending_validations: linhas com validation_id, expense_id, service_name, value_brl,
+    validation_month, is_overdue, owner_id e owner_name.
+    Idempotente no dia (dedup_key "digest:{destinatário}:{data}"). Retorna os ids criados.
+    """
+    recipients: dict[UUID, dict] = {}
+    for r in renewals:
+        entry = recipients.setdefault(r.owner_id, {"name": r.owner_name, "renewals": [], "validations": []})
+        entry["renewals"].append(r)
+    for v in pending_validations:
+        entry = recipients.setdefault(v.owner_id, {"name": v.owner_name, "renewals": [], "validations": []})
+        entry["validations"].append(v)
+
+    specs = []
+    for recipient_id, entry in recipients.items():
+        renewal_items = sorted(entry["renewals"], key=lambda r: (r.renewal_date, r.service_name))
+        validation_items = sorted(entry["validations"], key=lambda v: (v.validation_month, v.service_name))
+        sections = []
+        if renewal_items:
+            sections.append(_digest_section("Renovações próximas", [
+                f"{r.service_name}: em {r.days_before} dia(s), {r.renewal_date.strftime('%d/%m/%Y')}, "
+                f"R$ {r.value_brl:.2f}"
+                for r in renewal_items
+            ]))
+        if validation_items:
+            sections.append(_digest_section("Validações pendentes", [
+                f"{v.service_name}: {v.validation_month.strftime('%m/%Y')}, R$ {v.value_brl:.2f}"
+                + (" (atrasada)" if v.is_overdue else "")
+                for v in validation_items
+            ]))
+        specs.append(AlertCreate(
+            alert_type=AlertType.DAILY_DIGEST,
+            title=(
+                f"Resumo diário: {len(renewal_items)} renovação(ões), "
+                f"{len(validation_items)} validação(ões) pendente(s)"
+            ),
+            message=(
+                f"📋 *Resumo de {digest_date.strftime('%d/%m/%Y')}*\n\n"
+                f"Olá {entry['name']},\n\n" + "\n\n".join(sections)
+            ),
+            recipient_id=recipient_id,
+            dedup_key=f"digest:{recipient_id}:{digest_date.isoformat()}",
+            payload={
+                "date": digest_date.isoformat(),
+                "renewals": [
+                    {
+                        "expense_id": str(r.expense_id),
+                        "service_name": r.service_name,
+                        "value_brl": float(r.value_brl),
+                        "renewal_date": r.renewal_date.isoformat(),
+                        "days_before": r.days_before,
+                        "contracted_plan": r.contracted_plan,
+                    }
+                    for r in renewal_items
+                ],
+                "pending_validations": [
+                    {
+                        "validation_id": str(v.validation_id),
+                        "expense_id": str(v.expense_id),
+                        "service_name": v.service_name,
+                        "value_brl": float(v.value_brl),
+                        "validation_month": v.validation_month.isoformat(),
+                        "is_overdue": v.is_overdue,
+                    }
+                    for v in validation_items
+                ],
+            },
+        ))
+    return create_alerts(db, specs)
+
+
 def create_renewal_due_alert(
     db: Session,
     expense: Expense
@@ -250,34 +497,62 @@ def create_renewal_due_alert(
     )
 
 
-def process_pending_alerts(db: Session, limit: int = 50) -> dict:
+def _claim_pending_alerts(db: Session, limit: int) -> list:
+    """
+    Reserva até `limit` alertas pendentes (mais antigos primeiro) com FOR UPDATE SKIP LOCKED:
+    linhas já reservadas por outro worker são puladas, nunca processadas em dobro.
+    O destinatário vem no mesmo SELECT (recipient_active é NULL se não existir).
+    """
+    return db.execute(
+        select(Alert.id, User.is_active.label("recipient_active"))
+        .outerjoin(User, User.id == Alert.recipient_id)
+        .where(Alert.status == AlertStatus.PENDING)
+        .order_by(Alert.created_at.asc())
+        .limit(limit)
+        .with_for_update(of=Alert, skip_locked=True)
+    ).all()
+
+
+def process_pending_alerts(db: Session, limit: int = 50, batch_size: int | None = None) -> dict:
     """
-    Processa alertas pendentes e tenta enviá-los.
+    Processa até `limit` alertas pendentes em lotes de batch_size
+    (padrão: ALERT_PROCESS_BATCH_SIZE). Cada lote é reservado com SKIP LOCKED,
+    finalizado com um único UPDATE (SENT, ou FAILED se o destinatário não existe/está
+    inativo) e um commit, que libera os locks. Seguro com vários workers em paralelo.
     Retorna estatísticas do processamento.
     """
-    pending_alerts = get_pending_alerts(db, limit)
-    
+    batch_size = batch_size or settings.ALERT_PROCESS_BATCH_SIZE
     stats = {
         "processed": 0,
         "sent": 0,
         "failed": 0
     }
-    
-    for alert in pending_alerts:
-        try:
-            result = send_alert(db, alert.id)
-            stats["processed"] += 1
-            
-            if result.status == AlertStatus.SENT:
-                stats["sent"] += 1
-            else:
-                stats["failed"] += 1
-        except Exception as e:
-            stats["failed"] += 1
-            # Atualizar alerta com erro
-            alert.status = AlertStatus.FAILED
-            alert.error_message = str(e)
-            alert.updated_at = datetime.now(timezone.utc)
-            db.commit()
-    
+
+    while stats["processed"] < limit:
+        claimed = _claim_pending_alerts(db, min(batch_size, limit - stats["processed"]))
+        if not claimed:
+            db.rollback()
+            break
+        sent_ids = [row.id for row in claimed if row.recipient_active]
+        is_sent = Alert.id.in_(sent_ids) if sent_ids else literal(False)
+        now = datetime.now(timezone.utc)
+        db.execute(
+            update(Alert)
+            .where(Alert.id.in_([row.id for row in claimed]))
+            .values(
+                status=case(
+                    (is_sent, cast(AlertStatus.SENT, Alert.status.type)),
+                    else_=cast(AlertStatus.FAILED, Alert.status.type),
+                ),
+                sent_at=case((is_sent, now), else_=None),
+                error_message=case((is_sent, None), else_=RECIPIENT_INACTIVE_ERROR),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        stats["processed"] += len(claimed)
+        stats["sent"] += len(sent_ids)
+        stats["failed"] += len(claimed) - len(sent_ids)
+
     return stats
@@ -0,0 +1,199 @@
+"""
+Push de alertas em tempo real (SSE) a partir de LISTEN/NOTIFY do PostgreSQL.
+
+Um trigger em alerts faz pg_notify('alert_created', ...) a cada INSERT. Cada processo
+mantém uma única conexão em LISTEN, lida pelo event loop (add_reader, sem polling; a
+conexão em si é aberta em thread para não bloquear o loop), e distribui os eventos
+para as filas asyncio dos clientes conectados do destinatário. Clientes ociosos não
+geram consultas.
+"""
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from uuid import UUID
+
+import psycopg2
+import psycopg2.extensions
+
+from app.core.config import settings
+from app.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+ALERT_NOTIFY_CHANNEL = "alert_created"  # Mesmo canal do trigger (migration r0s1t2u3v4w5)
+RECONNECT_DELAY_SECONDS = 5.0
+# Timeout de conexão e TCP keepalives: banco inacessível ou conexão meio-aberta viram erro
+# no socket (o loop é notificado e reconecta) em vez de espera indefinida.
+LISTEN_CONNECT_OPTIONS = {
+    "connect_timeout": 5,
+    "keepalives": 1,
+    "keepalives_idle": 30,
+    "keepalives_interval": 10,
+    "keepalives_count": 3,
+}
+
+
+def _listen_connection():
+    """
+    Conexão psycopg2 dedicada (fora do pool), em autocommit, para o LISTEN.
+    Bloqueante: chamar via asyncio.to_thread. Opções na query da DATABASE_URL prevalecem.
+    """
+    url = engine.url
+    conn = psycopg2.connect(
+        **url.translate_connect_args(username="user", database="dbname"),
+        **{**LISTEN_CONNECT_OPTIONS, **url.query},
+    )
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cursor:
+        cursor.execute(f"LISTEN {ALERT_NOTIFY_CHANNEL}")
+    return conn
+
+
+class AlertBroadcaster:
+    """Distribui notificações de novos alertas para as filas dos clientes SSE (por destinatário)."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: dict[UUID, set[asyncio.Queue]] = defaultdict(set)
+        self._conn = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reconnect: asyncio.TimerHandle | None = None
+        self._connecting: asyncio.Task | None = None
+        self._stopped = True
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def start(self) -> None:
+        """Inicia a conexão em background; não bloqueia (o startup não espera o banco)."""
+        self._loop = asyncio.get_running_loop()
+        self._stopped = False
+        self._start_connect()
+
+    def stop(self) -> None:
+        self._stopped = True
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            self._reconnect = None
+        if self._connecting is not None:
+            self._connecting.cancel()
+            self._connecting = None
+        self._disconnect()
+
+    def _start_connect(self) -> None:
+        self._reconnect = None
+        if not self._stopped and self._connecting is None:
+            self._connecting = self._loop.create_task(self._connect(), name="alert-listen-connect")
+
+    async def _connect(self) -> None:
+        try:
+            conn = await asyncio.to_thread(_listen_connection)
+        except psycopg2.Error:
+            logger.exception("LISTEN %s: falha ao conectar, nova tentativa em %ss",
+                             ALERT_NOTIFY_CHANNEL, RECONNECT_DELAY_SECONDS)
+            self._connecting = None
+            self._schedule_reconnect()
+            return
+        except asyncio.CancelledError:
+            # stop() durante a conexão: a thread termina sozinha; a conexão é descartada
+            return
+        self._connecting = None
+        if self._stopped:
+            conn.close()
+            return
+        # De volta ao loop: registrar o leitor aqui, nunca a partir da thread
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        logger.info("LISTEN %s ativo", ALERT_NOTIFY_CHANNEL)
+
+    def _disconnect(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except (ValueError, OSError):
+            pass
+        try:
+            self._conn.close()
+        except psycopg2.Error:
+            pass
+        self._conn = None
+
+    def _schedule_reconnect(self) -> None:
+        if not self._stopped and self._reconnect is None:
+            self._reconnect = self._loop.call_later(RECONNECT_DELAY_SECONDS, self._start_connect)
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except (psycopg2.Error, OSError):
+            logger.exception("LISTEN %s: conexão perdida", ALERT_NOTIFY_CHANNEL)
+            self._disconnect()
+            self._schedule_reconnect()
+            return
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            try:
+                event = json.loads(notify.payload)
+                recipient_id = UUID(event["recipient_id"])
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Notificação de alerta inválida: %r", notify.payload)
+                continue
+            self.publish(recipient_id, event)
+
+    def publish(self, recipient_id: UUID, event: dict) -> None:
+        """Entrega o evento às filas do destinatário; cliente com fila cheia perde o evento."""
+        for queue in self._subscribers.get(recipient_id, ()):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                logger.warning("Fila SSE cheia para %s; evento descartado", recipient_id)
+
+    def subscribe(self, recipient_id: UUID) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[recipient_id].add(queue)
+        return queue
+
+    def unsubscribe(self, recipient_id: UUID, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(recipient_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[recipient_id]
+
+
+alert_broadcaster = AlertBroadcaster(queue_size=settings.ALERT_STREAM_QUEUE_SIZE)
+
+
+async def alert_event_stream(recipient_id: UUID, expires_at: datetime):
+    """
+    Gerador SSE para um usuário: eventos "alert" com o payload do NOTIFY e comentários
+    de keep-alive a cada ALERT_STREAM_HEARTBEAT_SECONDS. Em expires_at (expiração do token
+    de acesso) envia "expired" e encerra. Cancela a inscrição ao desconectar.
+    """
+    queue = alert_broadcaster.subscribe(recipient_id)
+    try:
+        yield f"retry: {int(RECONNECT_DELAY_SECONDS * 1000)}\nevent: ready\ndata: {{}}\n\n"
+        while True:
+            remaining = (expires_at - datetime.now(timezone.utc)).total_seconds()
+            if remaining <= 0:
+                yield "event: expired\ndata: {}\n\n"
+                return
+            try:
+                event = await asyncio.wait_for(
+                    queue.get(), timeout=min(settings.ALERT_STREAM_HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event.get('id')}\nevent: alert\ndata: {json.dumps(event)}\n\n"
+    finally:
+        alert_broadcaster.unsubscribe(recipient_id, queue)
@@ -1,9 +1,21 @@
+import logging
+import threading
+import time
 from decimal import Decimal
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
 
 import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.exchange_rate import ExchangeRate
+from app.models.expense import Currency, Expense, ExpenseStatus
+
+logger = logging.getLogger(__name__)
 
 
 class ExchangeRateResult:
@@ -18,26 +30,22 @@ async def get_usd_to_brl_rate() -> ExchangeRateResult | None:
         async with httpx.AsyncClient() as client:
             response = await client.get(settings.AWESOME_API_URL, timeout=10.0)
             response.raise_for_status()
-            
+
             data = response.json()
             rate = Decimal(data["USDBRL"]["bid"])
             date = datetime.now(timezone.utc)
-            
+
             return ExchangeRateResult(rate=rate, date=date)
     except Exception as e:
         print(f"Erro ao buscar cotação: {e}")
         return None
 
 
-# Taxa fallback quando a API de cotações falha (evita 502 ao criar despesa em USD)
-USD_BRL_FALLBACK_RATE = Decimal("5.50")
-
-
-def get_usd_to_brl_rate_sync() -> ExchangeRateResult | None:
+def get_usd_to_brl_rate_sync(timeout: float = 10.0) -> ExchangeRateResult | None:
     """Versão síncrona para buscar cotação"""
     try:
         with httpx.Client() as client:
-            response = client.get(settings.AWESOME_API_URL, timeout=10.0)
+            response = client.get(settings.AWESOME_API_URL, timeout=timeout)
             response.raise_for_status()
             data = response.json()
             # Awesome API: {"USDBRL": {"bid": "5.12", ...}}
@@ -52,25 +60,254 @@ def get_usd_to_brl_rate_sync() -> ExchangeRateResult | None:
     return None
 
 
+def _app_date(value: datetime) -> date:
+    """Dia da cotação no timezone da aplicação (APP_TIMEZONE)."""
+    return value.astimezone(ZoneInfo(settings.APP_TIMEZONE)).date()
+
+
+def save_rate(result: ExchangeRateResult, base: str = "USD", quote: str = "BRL") -> None:
+    """Grava a cotação do dia em exchange_rates (upsert: última cotação obtida no dia prevalece)."""
+    db = SessionLocal()
+    try:
+        stmt = pg_insert(ExchangeRate).values(
+            base_currency=base,
+            quote_currency=quote,
+            rate=result.rate,
+            rate_date=_app_date(result.date),
+            fetched_at=result.date,
+            created_at=result.date,
+            updated_at=result.date,
+        )
+        db.execute(stmt.on_conflict_do_update(
+            constraint="uq_exchange_rate_pair_date",
+            set_={
+                "rate": stmt.excluded.rate,
+                "fetched_at": stmt.excluded.fetched_at,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ))
+        db.commit()
+    finally:
+        db.close()
+
+
+def load_last_known_rate(base: str = "USD", quote: str = "BRL") -> ExchangeRateResult | None:
+    """Última cotação persistida (last-known-good)."""
+    db = SessionLocal()
+    try:
+        row = db.query(ExchangeRate.rate, ExchangeRate.fetched_at).filter(
+            ExchangeRate.base_currency == base,
+            ExchangeRate.quote_currency == quote,
+        ).order_by(ExchangeRate.rate_date.desc(), ExchangeRate.fetched_at.desc()).first()
+        return ExchangeRateResult(rate=row.rate, date=row.fetched_at) if row else None
+    finally:
+        db.close()
+
+
+class UsdBrlRateProvider:
+    """
+    Cotação USD → BRL para o caminho das requisições, sem esperar pela rede:
+    - cache em memória com TTL; valor vencido continua sendo servido enquanto
+      um refresh roda em background (stale-while-revalidate);
+    - single-flight: no máximo uma busca na API por vez;
+    - circuit breaker: após N falhas seguidas, não busca durante o cooldown;
+    - sem cache em memória, usa a última cotação persistida (exchange_rates).
+    """
+
+    def __init__(self, ttl_seconds: int, failure_threshold: int, cooldown_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._current: ExchangeRateResult | None = None
+        self._fetched_at = 0.0  # time.monotonic() da última busca bem-sucedida
+        self._refreshing = False
+        self._failures = 0
+        self._open_until = 0.0
+
+    def _is_stale(self) -> bool:
+        return self._current is None or (time.monotonic() - self._fetched_at) >= self.ttl_seconds
+
+    def _try_start_refresh(self) -> bool:
+        """Marca refresh em andamento; False se já há um (single-flight) ou o circuito está aberto."""
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._open_until:
+                return False
+            self._refreshing = True
+            return True
+
+    def _refresh(self) -> ExchangeRateResult | None:
+        result = None
+        try:
+            result = get_usd_to_brl_rate_sync(timeout=settings.FX_HTTP_TIMEOUT_SECONDS)
+        finally:
+            with self._lock:
+                self._refreshing = False
+                if result is None:
+                    self._failures += 1
+                    if self._failures >= self.failure_threshold:
+                        self._open_until = time.monotonic() + self.cooldown_seconds
+                        logger.warning(
+                            "Cotação USD/BRL: %d falhas seguidas, novas buscas suspensas por %ds",
+                            self._failures, self.cooldown_seconds,
+                        )
+                else:
+                    self._failures = 0
+                    self._open_until = 0.0
+                    self._current = result
+                    self._fetched_at = time.monotonic()
+        if result is not None:
+            try:
+                save_rate(result)
+            except Exception:
+                logger.exception("Erro ao persistir cotação USD/BRL")
+        return result
+
+    def refresh(self) -> ExchangeRateResult | None:
+        """Busca síncrona (startup/scheduler). Se já houver busca em andamento, não duplica."""
+        if not self._try_start_refresh():
+            return None
+        return self._refresh()
+
+    def refresh_in_background(self) -> None:
+        if self._try_start_refresh():
+            threading.Thread(target=self._refresh, name="fx-refresh", daemon=True).start()
+
+    def refresh_if_stale(self) -> None:
+        if self._is_stale():
+            self.refresh_in_background()
+
+    def get_rate(self) -> ExchangeRateResult:
+        """
+        Cotação atual sem I/O de rede. Dispara refresh em background se vencida.
+        Levanta ValueError se não houver nenhuma cotação conhecida (nem em memória nem persistida).
+        """
+        with self._lock:
+            current = self._current
+            stale = self._is_stale()
+        if current is None:
+            try:
+                current = load_last_known_rate()
+            except Exception:
+                logger.exception("Erro ao carregar última cotação USD/BRL persistida")
+            if current is not None:
+                with self._lock:
+                    if self._current is None:
+                        self._current = current  # _fetched_at = 0: continua vencida até o refresh
+        if stale:
+            self.refresh_in_background()
+        if current is None:
+            raise ValueError("Cotação USD/BRL indisponível no momento. Tente novamente em instantes.")
+        return current
+
+
+usd_brl_rate_provider = UsdBrlRateProvider(
+    ttl_seconds=settings.FX_CACHE_TTL_SECONDS,
+    failure_threshold=settings.FX_BREAKER_FAILURE_THRESHOLD,
+    cooldown_seconds=settings.FX_BREAKER_COOLDOWN_SECONDS,
+)
+
+
+def get_usd_to_brl_rate_cached() -> tuple[Decimal, datetime]:
+    """Cotação USD → BRL do provider em cache: (taxa, data da cotação)."""
+    result = usd_brl_rate_provider.get_rate()
+    return result.rate, result.date
+
+
 def convert_to_brl(value: Decimal, currency: str, exchange_rate: Decimal | None = None) -> tuple[Decimal, Decimal | None, datetime | None]:
     """
     Converte valor para BRL.
     Retorna: (value_brl, exchange_rate, exchange_rate_date)
-    Para USD, se a API de cotação falhar, usa taxa fallback.
+    Para USD, usa a cotação em cache (nunca espera pela API de cotação).
+    Levanta ValueError se nenhuma cotação estiver disponível.
     """
     if currency == "BRL":
         return value, None, None
 
     if exchange_rate is None:
-        result = get_usd_to_brl_rate_sync()
-        if result is None:
-            exchange_rate = USD_BRL_FALLBACK_RATE
-            exchange_date = datetime.now(timezone.utc)
-        else:
-            exchange_rate = result.rate
-            exchange_date = result.date
+        exchange_rate, exchange_date = get_usd_to_brl_rate_cached()
     else:
         exchange_date = datetime.now(timezone.utc)
 
     value_brl = value * exchange_rate
-    return value_brl, exchange_rate, exchange_date
\ No newline at end of file
+    return value_brl, exchange_rate, exchange_date
+
+
+def has_rate_for_date(db: Session, rate_date: date, base: str = "USD", quote: str = "BRL") -> bool:
+    """Indica se já existe snapshot da cotação para o dia."""
+    return db.query(ExchangeRate.id).filter(
+        ExchangeRate.base_currency == base,
+        ExchangeRate.quote_currency == quote,
+        ExchangeRate.rate_date == rate_date,
+    ).first() is not None
+
+
+def _rate_as_of(as_of: date, base: str = "USD", quote: str = "BRL"):
+    """Cotação vigente em as_of: snapshot mais recente com rate_date <= as_of."""
+    return (
+        select(ExchangeRate.rate, ExchangeRate.rate_date, ExchangeRate.fetched_at)
+        .where(
+            ExchangeRate.base_currency == base,
+            ExchangeRate.quote_currency == quote,
+            ExchangeRate.rate_date <= as_of,
+        )
+        .order_by(ExchangeRate.rate_date.desc())
+        .limit(1)
+        .subquery("fx")
+    )
+
+
+def revalue_usd_expenses(db: Session, as_of: date | None = None, dry_run: bool = False) -> dict:
+    """
+    Recalcula value_brl / exchange_rate / exchange_rate_date das despesas em USD
+    (exceto canceladas) com a cotação vigente em as_of (padrão: hoje, APP_TIMEZONE).
+    Um único UPDATE ... FROM com a tabela de cotações; só altera despesas cuja taxa mudou.
+    Com dry_run, apenas conta as despesas afetadas e a variação total em BRL.
+    Levanta ValueError se não houver cotação até as_of.
+    """
+    if as_of is None:
+        as_of = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).date()
+    fx = _rate_as_of(as_of)
+    rate_row = db.execute(select(fx.c.rate, fx.c.rate_date)).first()
+    if rate_row is None:
+        raise ValueError(f"Nenhuma cotação USD/BRL registrada até {as_of.isoformat()}")
+
+    new_value_brl = func.round(Expense.value * fx.c.rate, 2)
+    criteria = (
+        Expense.currency == Currency.USD,
+        Expense.status != ExpenseStatus.CANCELLED,
+        Expense.exchange_rate.is_distinct_from(fx.c.rate),
+    )
+    result = {
+        "dry_run": dry_run,
+        "as_of": as_of.isoformat(),
+        "rate": rate_row.rate,
+        "rate_date": rate_row.rate_date.isoformat(),
+    }
+
+    if dry_run:
+        count, delta = db.execute(
+            select(
+                func.count(Expense.id),
+                func.coalesce(func.sum(new_value_brl - Expense.value_brl), 0),
+            ).where(*criteria)
+        ).one()
+        result.update(count=count, delta_brl=delta)
+        return result
+
+    stmt = (
+        update(Expense)
+        .where(*criteria)
+        .values(
+            value_brl=new_value_brl,
+            exchange_rate=fx.c.rate,
+            exchange_rate_date=fx.c.fetched_at,
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(Expense.id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = db.execute(stmt).all()
+    db.commit()
+    result.update(count=len(rows))
+    return result
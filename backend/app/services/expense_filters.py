@@ -0,0 +1,85 @@
+"""
+Filtros de listagem de despesas, compartilhados por expense_service e
+expense_validation_service (que faz join com Expense).
+"""
+from uuid import UUID
+
+from sqlalchemy import String, func, or_
+from sqlalchemy.orm import Query
+
+from app.core.config import settings
+from app.models.expense import Expense, ExpenseStatus, ExpenseType
+
+
+# Funções SQL criadas na migration l4m5n6o7p8q9 (schema da aplicação)
+_search_sql = getattr(func, settings.DATABASE_SCHEMA)
+
+
+def search_document():
+    """Texto pesquisável (nome, código, descrição) sem acento e minúsculo; é a expressão do índice trigram."""
+    return _search_sql.expense_search_document(
+        Expense.service_name, Expense.code, Expense.description, type_=String
+    )
+
+
+def search_term(term: str):
+    """Normaliza o termo buscado da mesma forma que o documento (lower + unaccent)."""
+    return _search_sql.search_normalize(term.strip(), type_=String)
+
+
+def escape_like(term: str) -> str:
+    """Escapa curingas do LIKE para que o termo seja buscado literalmente."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_filters(
+    query: Query,
+    company_ids: list[UUID] | None = None,
+    department_ids: list[UUID] | None = None,
+    owner_ids: list[UUID] | None = None,
+    created_by_id: UUID | None = None,
+    category_ids: list[UUID] | None = None,
+    statuses: list[ExpenseStatus] | None = None,
+    expense_types: list[ExpenseType] | None = None,
+    service_name: str | None = None,
+) -> Query | None:
+    """
+    Aplica os filtros de listagem em uma query que tenha Expense no FROM.
+    Retorna None quando algum filtro de escopo é lista vazia (nenhum resultado).
+    """
+    # Tratar company_ids: lista vazia = nenhum resultado
+    if company_ids is not None:
+        if len(company_ids) == 0:
+            return None
+        query = query.filter(Expense.company_id.in_(company_ids))
+    
+    # Tratar department_ids: lista vazia = nenhum resultado
+    if department_ids is not None:
+        if len(department_ids) == 0:
+            return None
+        query = query.filter(Expense.department_id.in_(department_ids))
+    
+    # Tratar owner_ids: lista vazia = nenhum resultado
+    if owner_ids is not None:
+        if len(owner_ids) == 0:
+            return None
+        query = query.filter(Expense.owner_id.in_(owner_ids))
+    
+    if created_by_id is not None:
+        query = query.filter(Expense.created_by_id == created_by_id)
+    if category_ids:
+        query = query.filter(Expense.category_id.in_(category_ids))
+    if statuses:
+        query = query.filter(Expense.status.in_(statuses))
+    if expense_types:
+        query = query.filter(Expense.expense_type.in_(expense_types))
+    if service_name and service_name.strip():
+        # Substring (LIKE) ou similaridade por palavra (<%), ambos servidos por idx_expense_search_trgm
+        document = search_document()
+        query = query.filter(
+            or_(
+                document.like("%" + search_term(escape_like(service_name)) + "%", escape="\\"),
+                search_term(service_name).op("<%", is_comparison=True)(document),
+            )
+        )
+    return query
@@ -1,25 +1,47 @@
-from uuid import UUID
+from typing import Iterator
+from uuid import UUID, uuid4
 from decimal import Decimal
 from datetime import datetime, timezone, date
 
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Row, func, insert, literal, select, tuple_
+from sqlalchemy import update as sql_update
+from sqlalchemy.orm import Query, Session, aliased, joinedload, selectinload
 
-from app.models.expense import Expense, Currency, ExpenseStatus, ExpenseType
+from app.core.permissions import can_create_expense_in_company, _role_value
+from app.models.category import Category
+from app.models.company import Company
+from app.models.department import Department
+from app.models.expense import Expense, Currency, ExpenseStatus, ExpenseType, ReviewStatus, expense_code_seq
 from app.models.expense_validation import ExpenseValidation
-from app.schemas.expense import ExpenseCreate, ExpenseUpdate
+from app.models.user import User, UserRole
+from app.schemas.expense import ExpenseCreate, ExpenseUpdate, ExpenseImportRowResult
+from app.services import exchange_service, expense_validation_service
+from app.services.expense_filters import apply_filters, search_document, search_term
+
+
+def _search_rank(term: str):
+    """Similaridade do termo com o documento (pg_trgm), usada para ordenar resultados da busca."""
+    return func.word_similarity(search_term(term), search_document())
+
+
+def _format_expense_code(number: int) -> str:
+    """Formata o número sequencial como código (1 -> DP01, 123 -> DP123)."""
+    return f"DP{number:02d}" if number < 100 else f"DP{number}"
 
 
 def _next_expense_code(db: Session) -> str:
-    """Retorna o próximo código sequencial (DP01, DP02, ...)."""
-    codes = db.query(Expense.code).filter(Expense.code.isnot(None)).all()
-    numbers = []
-    for (code,) in codes:
-        if code and code.startswith("DP"):
-            suffix = code[2:].lstrip("0") or "0"
-            if suffix.isdigit():
-                numbers.append(int(suffix))
-    next_num = max(numbers, default=0) + 1
-    return f"DP{next_num:02d}" if next_num < 100 else f"DP{next_num}"
+    """Retorna o próximo código sequencial (DP01, DP02, ...) via expense_code_seq."""
+    return _format_expense_code(db.execute(select(expense_code_seq.next_value())).scalar_one())
+
+
+def allocate_expense_codes(db: Session, count: int) -> list[str]:
+    """Reserva um bloco de códigos sequenciais em um único round trip."""
+    if count <= 0:
+        return []
+    numbers = db.execute(
+        select(expense_code_seq.next_value()).select_from(func.generate_series(1, count))
+    ).scalars().all()
+    return [_format_expense_code(n) for n in sorted(numbers)]
 
 
 def get_all(db: Session) -> list[Expense]:
@@ -36,58 +58,148 @@ def get_all(db: Session) -> list[Expense]:
         .all()
 
 
-def get_filtered(
-    db: Session,
-    company_ids: list[UUID] | None = None,
-    department_ids: list[UUID] | None = None,
-    owner_ids: list[UUID] | None = None,
-    created_by_id: UUID | None = None,
-    category_ids: list[UUID] | None = None,
-    statuses: list[ExpenseStatus] | None = None,
-    expense_types: list[ExpenseType] | None = None,
-    service_name: str | None = None,
-) -> list[Expense]:
-    """Lista despesas com filtros opcionais (listas). Lista vazia = nenhum resultado, None = não filtra."""
-    query = db.query(Expense).options(
-        joinedload(Expense.category),
-        joinedload(Expense.company),
-        joinedload(Expense.department),
-        joinedload(Expense.owner),
-        joinedload(Expense.approver),
+def _summary_query(db: Session) -> Query:
+    """
+    Query só de colunas para listagens (view=summary): campos exibidos na tabela
+    e nomes das entidades relacionadas, sem objetos ORM nem identity map.
+    """
+    owner = aliased(User)
+    return db.query(
+        Expense.id,
+        Expense.code,
+        Expense.service_name,
+        Expense.expense_type,
+        Expense.value,
+        Expense.currency,
+        Expense.value_brl,
+        Expense.periodicity,
+        Expense.renewal_date,
+        Expense.status,
+        Expense.review_status,
+        Expense.category_id,
+        Category.name.label("category_name"),
+        Expense.company_id,
+        Company.name.label("company_name"),
+        Expense.department_id,
+        Department.name.label("department_name"),
+        Expense.owner_id,
+        owner.name.label("owner_name"),
+        Expense.created_at,
+    ).join(Category, Expense.category_id == Category.id)\
+        .join(Company, Expense.company_id == Company.id)\
+        .join(Department, Expense.department_id == Department.id)\
+        .join(owner, Expense.owner_id == owner.id)
+
+
+def get_filtered_summary(db: Session, service_name: str | None = None, **filters) -> list[Row]:
+    """Como get_filtered, mas retorna apenas as colunas de listagem (view=summary)."""
+    query = apply_filters(_summary_query(db), service_name=service_name, **filters)
+    if query is None:
+        return []
+    if service_name and service_name.strip():
+        query = query.order_by(_search_rank(service_name).desc())
+    return query.order_by(Expense.created_at.desc()).all()
+
+
+EXPORT_BATCH_SIZE = 1000
+
+
+def iter_export_rows(db: Session, **filters) -> Iterator[Row]:
+    """
+    Itera as despesas filtradas para exportação usando cursor no servidor (yield_per),
+    mantendo memória constante independente do número de linhas.
+    """
+    query = apply_filters(
+        _summary_query(db).add_columns(
+            Expense.description,
+            Expense.payment_method,
+            Expense.contracted_plan,
+            Expense.user_count,
+            Expense.exchange_rate,
+            Expense.cancellation_month,
+        ),
+        **filters,
     )
-    
-    # Tratar company_ids: lista vazia = nenhum resultado
-    if company_ids is not None:
-        if len(company_ids) == 0:
-            return []
-        query = query.filter(Expense.company_id.in_(company_ids))
-    
-    # Tratar department_ids: lista vazia = nenhum resultado
-    if department_ids is not None:
-        if len(department_ids) == 0:
-            return []
-        query = query.filter(Expense.department_id.in_(department_ids))
-    
-    # Tratar owner_ids: lista vazia = nenhum resultado
-    if owner_ids is not None:
-        if len(owner_ids) == 0:
-            return []
-        query = query.filter(Expense.owner_id.in_(owner_ids))
-    
-    if created_by_id is not None:
-        query = query.filter(Expense.created_by_id == created_by_id)
-    if category_ids:
-        query = query.filter(Expense.category_id.in_(category_ids))
-    if statuses:
-        query = query.filter(Expense.status.in_(statuses))
-    if expense_types:
-        query = query.filter(Expense.expense_type.in_(expense_types))
+    if query is None:
+        return iter(())
+    return iter(
+        query.order_by(Expense.created_at.desc(), Expense.id.desc())
+        .yield_per(EXPORT_BATCH_SIZE)
+    )
+
+
+def get_filtered(db: Session, service_name: str | None = None, **filters) -> list[Expense]:
+    """
+    Lista despesas com filtros opcionais (listas). Lista vazia = nenhum resultado, None = não filtra.
+    Com service_name, resultados mais similares ao termo vêm primeiro.
+    """
+    query = apply_filters(
+        db.query(Expense).options(
+            joinedload(Expense.category),
+            joinedload(Expense.company),
+            joinedload(Expense.department),
+            joinedload(Expense.owner),
+            joinedload(Expense.approver),
+        ),
+        service_name=service_name,
+        **filters,
+    )
+    if query is None:
+        return []
     if service_name and service_name.strip():
-        query = query.filter(Expense.service_name.ilike(f"%{service_name.strip()}%"))
+        query = query.order_by(_search_rank(service_name).desc())
     query = query.order_by(Expense.created_at.desc())
     return query.all()
 
 
+def get_filtered_page(
+    db: Session,
+    after: tuple[datetime, UUID] | None = None,
+    limit: int = 50,
+    include_total: bool = False,
+    summary: bool = False,
+    **filters,
+) -> tuple[list[Expense] | list[Row], tuple[datetime, UUID] | None, int | None]:
+    """
+    Página de despesas por keyset em (created_at, id), mais recente primeiro.
+    after: chave (created_at, id) da última linha da página anterior.
+    summary: retorna linhas de _summary_query em vez de objetos ORM.
+    Retorna (itens, chave da próxima página ou None, total ou None).
+    O total só é calculado se include_total (COUNT sem joins nem ordenação).
+    """
+    base = apply_filters(db.query(Expense), **filters)
+    if base is None:
+        return [], None, (0 if include_total else None)
+
+    total = None
+    if include_total:
+        total = base.with_entities(func.count(Expense.id)).order_by(None).scalar() or 0
+
+    if summary:
+        query = apply_filters(_summary_query(db), **filters)
+    else:
+        query = base.options(
+            joinedload(Expense.category),
+            joinedload(Expense.company),
+            joinedload(Expense.department),
+            joinedload(Expense.owner),
+            joinedload(Expense.approver),
+        )
+    if after is not None:
+        after_created_at, after_id = after
+        query = query.filter(
+            tuple_(Expense.created_at, Expense.id)
+            < tuple_(literal(after_created_at, Expense.created_at.type), literal(after_id, Expense.id.type))
+        )
+    rows = query.order_by(Expense.created_at.desc(), Expense.id.desc()).limit(limit + 1).all()
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1].created_at, rows[-1].id)
+    return rows, next_key, total
+
+
 def get_by_id(db: Session, expense_id: UUID) -> Expense | None:
     """Busca despesa por ID com relacionamentos (inclui validations e validator para histórico)."""
     return db.query(Expense)\
@@ -205,6 +317,227 @@ def create(
     return expense
 
 
+MAX_IMPORT_ROWS = 1000
+
+
+def bulk_create(
+    db: Session,
+    rows: list[tuple[int, ExpenseCreate]],
+    current_user: User,
+) -> list[ExpenseImportRowResult]:
+    """
+    Importa despesas em lote. rows: pares (número da linha, dados).
+    Valida todas as referências com uma consulta por entidade, busca a cotação uma vez,
+    reserva os códigos em bloco e insere despesas + validações do mês em statements em lote,
+    com um único commit. Linhas inválidas voltam com erros e não são inseridas.
+    """
+    category_ids = {data.category_id for _, data in rows}
+    company_ids = {data.company_id for _, data in rows}
+    department_ids = {data.department_id for _, data in rows}
+    owner_ids = {data.owner_id for _, data in rows}
+    approver_ids = {data.approver_id for _, data in rows if data.approver_id is not None}
+
+    existing_categories = set(
+        db.execute(select(Category.id).where(Category.id.in_(category_ids))).scalars()
+    ) if category_ids else set()
+    existing_companies = set(
+        db.execute(select(Company.id).where(Company.id.in_(company_ids))).scalars()
+    ) if company_ids else set()
+    department_company = dict(
+        db.execute(select(Department.id, Department.company_id).where(Department.id.in_(department_ids))).all()
+    ) if department_ids else {}
+    owners = {
+        u.id: u for u in db.query(User).options(selectinload(User.companies)).filter(User.id.in_(owner_ids))
+    } if owner_ids else {}
+    # approver_id é FK NOT NULL: um id desconhecido faria o INSERT em lote falhar inteiro
+    missing_approvers = approver_ids - owners.keys()
+    existing_approvers = owners.keys() | set(
+        db.execute(select(User.id).where(User.id.in_(missing_approvers))).scalars()
+    ) if missing_approvers else owners.keys()
+
+    results: list[ExpenseImportRowResult] = []
+    valid: list[tuple[ExpenseImportRowResult, ExpenseCreate]] = []
+    for row_number, data in rows:
+        errors = []
+        if data.category_id not in existing_categories:
+            errors.append("Categoria não encontrada")
+        if data.company_id not in existing_companies:
+            errors.append("Empresa não encontrada")
+        if data.department_id not in department_company:
+            errors.append("Setor não encontrado")
+        elif department_company[data.department_id] != data.company_id:
+            errors.append("O setor selecionado não pertence à empresa escolhida")
+        owner = owners.get(data.owner_id)
+        if owner is None:
+            errors.append("Responsável não encontrado")
+        elif _role_value(owner.role) not in (UserRole.SYSTEM_ADMIN.value, UserRole.FINANCE_ADMIN.value):
+            if data.company_id not in [c.id for c in owner.companies]:
+                errors.append("O responsável selecionado não pertence à empresa escolhida")
+        if data.approver_id is not None and data.approver_id not in existing_approvers:
+            errors.append("Aprovador não encontrado")
+        if not can_create_expense_in_company(current_user, data.company_id):
+            errors.append("Você não tem permissão para criar despesa nesta empresa")
+
+        result = ExpenseImportRowResult(row=row_number, errors=errors)
+        results.append(result)
+        if not errors:
+            valid.append((result, data))
+
+    if not valid:
+        return results
+
+    usd_rate = usd_rate_date = None
+    if any(data.currency == Currency.USD for _, data in valid):
+        usd_rate, usd_rate_date = exchange_service.get_usd_to_brl_rate_cached()
+
+    codes = allocate_expense_codes(db, len(valid))
+    now = datetime.now(timezone.utc)
+    expense_rows = []
+    for (result, data), code in zip(valid, codes):
+        is_usd = data.currency == Currency.USD
+        result.id = uuid4()
+        result.code = code
+        expense_rows.append({
+            "id": result.id,
+            "code": code,
+            "service_name": data.service_name,
+            "description": data.description,
+            "expense_type": data.expense_type,
+            "category_id": data.category_id,
+            "company_id": data.company_id,
+            "department_id": data.department_id,
+            "owner_id": data.owner_id,
+            # Responsável = validador: se approver_id não vier, usa owner_id
+            "approver_id": data.approver_id if data.approver_id is not None else data.owner_id,
+            "value": data.value,
+            "currency": data.currency,
+            "value_brl": data.value * usd_rate if is_usd else data.value,
+            "exchange_rate": usd_rate if is_usd else None,
+            "exchange_rate_date": usd_rate_date if is_usd else None,
+            "periodicity": data.periodicity,
+            "renewal_date": data.renewal_date,
+            "payment_method": data.payment_method,
+            "payment_identifier": data.payment_identifier,
+            "contracted_plan": data.contracted_plan,
+            "user_count": data.user_count,
+            "evidence_link": data.evidence_link,
+            "login": data.login,
+            "password": (data.password.strip() if data.password and data.password.strip() else "N/A"),
+            "notes": data.notes,
+            "status": ExpenseStatus.ACTIVE,
+            "review_status": ReviewStatus.NORMAL,
+            "created_by_id": current_user.id,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    try:
+        db.execute(insert(Expense), expense_rows)
+        expense_validation_service.insert_creation_month_validations(db, [r["id"] for r in expense_rows])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return results
+
+
+def _batch_update(
+    db: Session,
+    values: dict,
+    expense_ids: list[UUID] | None = None,
+    extra_criteria: list | None = None,
+    **filters,
+) -> list[UUID]:
+    """
+    UPDATE único (set-based) nas despesas que atendem aos filtros/escopo e, se informado,
+    pertencem a expense_ids. Um commit; retorna os ids afetados.
+    """
+    query = apply_filters(db.query(Expense.id), **filters)
+    if query is None:
+        return []
+    if expense_ids is not None:
+        if not expense_ids:
+            return []
+        query = query.filter(Expense.id.in_(expense_ids))
+    for criterion in extra_criteria or []:
+        query = query.filter(criterion)
+
+    stmt = sql_update(Expense)\
+        .values(**values, updated_at=datetime.now(timezone.utc))\
+        .returning(Expense.id)\
+        .execution_options(synchronize_session=False)
+    if query.whereclause is not None:
+        stmt = stmt.where(query.whereclause)
+    affected = list(db.execute(stmt).scalars().all())
+    db.commit()
+    return affected
+
+
+def batch_cancel(
+    db: Session,
+    charged_this_month: bool,
+    cancellation_month: date | None = None,
+    cancelled_by_id: UUID | None = None,
+    expense_ids: list[UUID] | None = None,
+    **filters,
+) -> list[UUID]:
+    """Cancela em lote (mesma semântica de cancel_with_info); despesas já canceladas são ignoradas."""
+    now = datetime.now(timezone.utc)
+    if cancellation_month is None:
+        cancellation_month = now.date().replace(day=1)
+    return _batch_update(
+        db,
+        {
+            "status": ExpenseStatus.CANCELLED,
+            "cancellation_month": cancellation_month,
+            "charged_when_cancelled": charged_this_month,
+            "cancelled_at": now,
+            "cancelled_by_id": cancelled_by_id,
+        },
+        expense_ids=expense_ids,
+        extra_criteria=[Expense.status != ExpenseStatus.CANCELLED],
+        **filters,
+    )
+
+
+def batch_reassign(
+    db: Session,
+    owner: User,
+    expense_ids: list[UUID] | None = None,
+    **filters,
+) -> list[UUID]:
+    """
+    Troca responsável (e validador, responsável = validador) em lote.
+    Se o novo responsável não for admin, só altera despesas das empresas dele.
+    """
+    extra_criteria = []
+    if _role_value(owner.role) not in (UserRole.SYSTEM_ADMIN.value, UserRole.FINANCE_ADMIN.value):
+        extra_criteria.append(Expense.company_id.in_([c.id for c in owner.companies]))
+    return _batch_update(
+        db,
+        {"owner_id": owner.id, "approver_id": owner.id},
+        expense_ids=expense_ids,
+        extra_criteria=extra_criteria,
+        **filters,
+    )
+
+
+def batch_set_review_status(
+    db: Session,
+    review_status: ReviewStatus,
+    expense_ids: list[UUID] | None = None,
+    **filters,
+) -> list[UUID]:
+    """Marca/desmarca revisão em lote."""
+    return _batch_update(
+        db,
+        {"review_status": review_status},
+        expense_ids=expense_ids,
+        extra_criteria=[Expense.review_status != review_status],
+        **filters,
+    )
+
+
 def update(
     db: Session,
     expense: Expense,
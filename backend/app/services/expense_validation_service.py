@@ -1,15 +1,21 @@
-from uuid import UUID
+from collections import Counter
+from uuid import UUID, uuid4
 from datetime import date, datetime, timezone, timedelta
 from zoneinfo import ZoneInfo
 
-from sqlalchemy.orm import Session, joinedload, subqueryload
-from sqlalchemy import and_
+from sqlalchemy.orm import Session, aliased, contains_eager, joinedload, selectinload, subqueryload
+from sqlalchemy import Date, Integer, and_, case, cast, column, exists, false, func, literal, null, or_, select, true, tuple_, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, insert as pg_insert
 
 from app.core.config import settings
+from app.core.permissions import can_approve_expense
+from app.models.company import Company
+from app.models.department import Department
 from app.models.expense_validation import ExpenseValidation, ValidationStatus
 from app.models.expense import Expense, ExpenseStatus, ExpenseType, Periodicity
 from app.models.user import User, UserRole
 from app.schemas.expense_validation import ExpenseValidationCreate
+from app.services.expense_filters import apply_filters
 
 
 def should_create_validation_for_month(expense: Expense, target_month: date) -> bool:
@@ -17,6 +23,7 @@ def should_create_validation_for_month(expense: Expense, target_month: date) ->
     Determina se deve criar validação para um mês específico baseado na periodicidade.
     Monthly: toda despesa ativa gera validação em todo mês posterior à criação.
     Quarterly/Semiannual/Annual: usa renewal_date como âncora do ciclo.
+    Referência em Python de _due_in_month_clause (paridade em tests/test_due_in_month_parity.py).
     """
     if expense.expense_type != ExpenseType.RECURRING or not expense.periodicity:
         return False
@@ -24,12 +31,15 @@ def should_create_validation_for_month(expense: Expense, target_month: date) ->
     target_first_day = target_month.replace(day=1)
 
     # Não criar validação para o mês de criação ou anteriores
-    # (o mês de criação é coberto por create_validation_for_creation_month)
-    creation_month = (
-        expense.created_at.replace(day=1).date()
-        if isinstance(expense.created_at, datetime)
-        else expense.created_at.replace(day=1)
-    )
+    # (o mês de criação é coberto por create_validation_for_creation_month),
+    # com o mês de criação no timezone da aplicação, como no SQL
+    created_at = expense.created_at
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)  # default do modelo: UTC sem tz
+        creation_month = created_at.astimezone(ZoneInfo(settings.APP_TIMEZONE)).date().replace(day=1)
+    else:
+        creation_month = created_at.replace(day=1)
     if target_first_day <= creation_month:
         return False
 
@@ -44,12 +54,7 @@ def should_create_validation_for_month(expense: Expense, target_month: date) ->
     else:
         anchor_month = creation_month
 
-    periodicity_months = {
-        Periodicity.QUARTERLY: 3,
-        Periodicity.SEMIANNUAL: 6,
-        Periodicity.ANNUAL: 12,
-    }
-    months_interval = periodicity_months.get(expense.periodicity, 1)
+    months_interval = PERIODICITY_MONTHS.get(expense.periodicity, 1)
 
     diff = (target_first_day.year - anchor_month.year) * 12 + (
         target_first_day.month - anchor_month.month
@@ -89,126 +94,209 @@ def create_validation_for_creation_month(db: Session, expense: Expense) -> Expen
     return validation
 
 
-def create_monthly_validations(db: Session, month_date: date) -> list[ExpenseValidation]:
+def insert_creation_month_validations(db: Session, expense_ids: list[UUID]) -> None:
+    """
+    Versão em lote de create_validation_for_creation_month: um INSERT para todas as despesas,
+    ignorando as que já têm validação no mês. Não faz commit (participa da transação do chamador).
+    """
+    if not expense_ids:
+        return
+    tz = ZoneInfo(settings.APP_TIMEZONE)
+    first_day = datetime.now(tz).date().replace(day=1)
+    now = datetime.now(timezone.utc)
+    db.execute(
+        pg_insert(ExpenseValidation).on_conflict_do_nothing(
+            index_elements=[ExpenseValidation.expense_id, ExpenseValidation.validation_month]
+        ),
+        [
+            {
+                "id": uuid4(),
+                "expense_id": expense_id,
+                "validator_id": None,
+                "validation_month": first_day,
+                "status": ValidationStatus.PENDING,
+                "is_overdue": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for expense_id in expense_ids
+        ],
+    )
+
+
+PERIODICITY_MONTHS = {
+    Periodicity.MONTHLY: 1,
+    Periodicity.QUARTERLY: 3,
+    Periodicity.SEMIANNUAL: 6,
+    Periodicity.ANNUAL: 12,
+}
+
+
+def _month_index(value):
+    """Índice absoluto do mês (ano * 12 + mês) de uma expressão date."""
+    return func.extract("year", value) * 12 + func.extract("month", value)
+
+
+def _due_in_month_clause(target_month):
+    """
+    Versão SQL de should_create_validation_for_month para uso em WHERE (mesma regra;
+    paridade em tests/test_due_in_month_parity.py).
+    target_month: expressão date (primeiro dia do mês), literal ou coluna.
+    O mês de criação é calculado no timezone da aplicação (APP_TIMEZONE).
+    """
+    creation_month = cast(
+        func.date_trunc("month", func.timezone(settings.APP_TIMEZONE, Expense.created_at)), Date
+    )
+    anchor_month = func.coalesce(cast(func.date_trunc("month", Expense.renewal_date), Date), creation_month)
+    interval = case(
+        {p: months for p, months in PERIODICITY_MONTHS.items()},
+        value=Expense.periodicity,
+        else_=1,
+    )
+    return and_(
+        Expense.expense_type == ExpenseType.RECURRING,
+        Expense.periodicity.isnot(None),
+        target_month > creation_month,
+        or_(
+            Expense.periodicity == Periodicity.MONTHLY,
+            func.mod(_month_index(target_month) - _month_index(anchor_month), interval) == 0,
+        ),
+    )
+
+
+def create_monthly_validations(db: Session, month_date: date) -> list[UUID]:
     """
     Cria validações para todas despesas recorrentes ativas do mês.
     Baseado na periodicidade da despesa.
     Não associa a nenhum validador inicialmente (validator_id = NULL).
+    Um único INSERT ... SELECT ... ON CONFLICT DO NOTHING; retorna os ids criados.
     """
-    # Primeiro dia do mês
-    first_day = month_date.replace(day=1)
-    
-    # Buscar todas despesas recorrentes ativas
-    active_expenses = db.query(Expense).filter(
+    return create_validations_for_months(db, [month_date.replace(day=1)])
+
+
+def create_validations_for_months(db: Session, months: list[date]) -> list[UUID]:
+    """
+    Versão multi-mês de create_monthly_validations: despesas ativas x meses (VALUES),
+    filtradas pela periodicidade, em um único INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    e um commit. months: primeiros dias dos meses. Retorna os ids criados.
+    """
+    if not months:
+        return []
+    month_values = values(column("validation_month", Date), name="months").data([(m,) for m in months])
+    month_col = month_values.c.validation_month
+    now = datetime.now(timezone.utc)
+
+    source = select(
+        func.gen_random_uuid(),
+        Expense.id,
+        null(),
+        month_col,
+        literal(ValidationStatus.PENDING, ExpenseValidation.status.type),
+        false(),
+        literal(now, ExpenseValidation.created_at.type),
+        literal(now, ExpenseValidation.updated_at.type),
+    ).select_from(Expense).join(month_values, true()).where(
         Expense.status == ExpenseStatus.ACTIVE,
-        Expense.expense_type == ExpenseType.RECURRING
-    ).all()
-    
-    validations = []
-    
-    for expense in active_expenses:
-        # Verificar se deve criar validação para este mês baseado na periodicidade
-        if not should_create_validation_for_month(expense, first_day):
-            continue
-        
-        # Verificar se já existe validação para este mês
-        existing = db.query(ExpenseValidation).filter(
-            and_(
-                ExpenseValidation.expense_id == expense.id,
-                ExpenseValidation.validation_month == first_day
-            )
-        ).first()
-        
-        if not existing:
-            validation = ExpenseValidation(
-                expense_id=expense.id,
-                validator_id=None,  # Não associar a nenhum validador inicialmente
-                validation_month=first_day,
-                status=ValidationStatus.PENDING,
-                is_overdue=False
-            )
-            db.add(validation)
-            validations.append(validation)
-    
+        _due_in_month_clause(month_col),
+    )
+    stmt = pg_insert(ExpenseValidation).from_select(
+        [
+            ExpenseValidation.id,
+            ExpenseValidation.expense_id,
+            ExpenseValidation.validator_id,
+            ExpenseValidation.validation_month,
+            ExpenseValidation.status,
+            ExpenseValidation.is_overdue,
+            ExpenseValidation.created_at,
+            ExpenseValidation.updated_at,
+        ],
+        source,
+    ).on_conflict_do_nothing(
+        index_elements=[ExpenseValidation.expense_id, ExpenseValidation.validation_month]
+    ).returning(ExpenseValidation.id)
+
+    ids = list(db.execute(stmt).scalars())
     db.commit()
-    
-    # Refresh todas as validações criadas
-    for validation in validations:
-        db.refresh(validation)
-    
-    return validations
-
-
-def _last_day_of_month(year: int, month: int) -> int:
-    """Retorna o último dia do mês (ex: fev/2024 -> 29, fev/2023 -> 28)."""
-    if month == 12:
-        next_first = date(year + 1, 1, 1)
-    else:
-        next_first = date(year, month + 1, 1)
-    last_day = next_first - timedelta(days=1)
-    return last_day.day
+    return ids
+
 
+def get_last_validation_month(db: Session) -> date | None:
+    """Mês mais recente com validações geradas (None se não houver nenhuma)."""
+    return db.query(func.max(ExpenseValidation.validation_month)).scalar()
+
+
+def _renewal_interval():
+    """Meses por ciclo conforme Expense.periodicity (expressão SQL)."""
+    return case(
+        {p: months for p, months in PERIODICITY_MONTHS.items()},
+        value=Expense.periodicity,
+        else_=1,
+    )
 
-def _advance_expense_renewal_date_once(expense: Expense) -> None:
+
+def renewal_date_after_cycles(renewal_date, interval, n_cycles):
     """
-    Avança a renewal_date da despesa em um ciclo (ex.: mensal 23/02 -> 23/03).
-    Modifica expense.renewal_date in-place. Não faz commit.
+    SQL da data após n_cycles (>= 1) ciclos de `interval` meses, igual ao avanço ciclo a ciclo:
+    o dia é limitado ao último dia de cada mês percorrido e o limite se mantém
+    (31/01 -> 28/02 -> 28/03).
     """
-    if not expense.renewal_date or not expense.periodicity:
-        return
-    periodicity_months = {
-        Periodicity.MONTHLY: 1,
-        Periodicity.QUARTERLY: 3,
-        Periodicity.SEMIANNUAL: 6,
-        Periodicity.ANNUAL: 12,
-    }
-    interval = periodicity_months.get(expense.periodicity, 1)
-    new_date = expense.renewal_date
-    month = new_date.month + interval
-    year = new_date.year + (month - 1) // 12
-    month = (month - 1) % 12 + 1
-    day = min(new_date.day, _last_day_of_month(year, month))
-    expense.renewal_date = date(year, month, day)
-
-
-def advance_renewal_dates(db: Session) -> int:
+    month_start = func.date_trunc("month", renewal_date)
+    step = func.generate_series(1, n_cycles).table_valued("n").render_derived(name="step")
+    # Menor "último dia do mês" entre os meses percorridos
+    min_last_day = (
+        select(func.min(cast(
+            func.extract("day", month_start + func.make_interval(0, step.c.n * interval + 1, 0, -1)),
+            Integer,
+        )))
+        .select_from(step)
+        .correlate_except(step)
+        .scalar_subquery()
+    )
+    day = func.least(cast(func.extract("day", renewal_date), Integer), min_last_day)
+    return cast(month_start + func.make_interval(0, n_cycles * interval, 0, day - 1), Date)
+
+
+def next_renewal_date(renewal_date, interval, today):
+    """SQL da primeira ocorrência >= today a partir de renewal_date (< today), ciclo a ciclo."""
+    months_behind = cast(_month_index(today) - _month_index(renewal_date), Integer)
+    # Menor número de ciclos que alcança o mês de hoje (pelo menos 1); no máximo mais um
+    cycles = func.greatest(1, (months_behind + interval - 1) // interval)
+    candidate = renewal_date_after_cycles(renewal_date, interval, cycles)
+    return case(
+        (candidate < today, renewal_date_after_cycles(renewal_date, interval, cycles + 1)),
+        else_=candidate,
+    )
+
+
+def advance_renewal_dates(db: Session) -> list[UUID]:
     """
     Avança renewal_date para a próxima ocorrência futura baseada na periodicidade.
     Despesas com renewal_date no passado têm a data atualizada (ex: 23/05/2025 -> 23/05/2026 para anual).
-    Preserva o dia original do mês (ex: dia 31 em jan -> 28 ou 29 em fev).
+    Mesmo resultado do avanço ciclo a ciclo: dia limitado ao fim de cada mês percorrido
+    (ex: dia 31 em jan -> 28 em fev -> 28 em mar). Ver renewal_date_after_cycles.
+    Um único UPDATE. Retorna os ids das despesas alteradas.
     """
-    today = date.today()
-
-    expenses = db.query(Expense).filter(
-        Expense.status == ExpenseStatus.ACTIVE,
-        Expense.expense_type == ExpenseType.RECURRING,
-        Expense.renewal_date.isnot(None),
-        Expense.renewal_date < today,
-        Expense.periodicity.isnot(None),
-    ).all()
-
-    periodicity_months = {
-        Periodicity.MONTHLY: 1,
-        Periodicity.QUARTERLY: 3,
-        Periodicity.SEMIANNUAL: 6,
-        Periodicity.ANNUAL: 12,
-    }
-
-    count = 0
-    for expense in expenses:
-        interval = periodicity_months.get(expense.periodicity, 1)
-        new_date = expense.renewal_date
-        while new_date < today:
-            month = new_date.month + interval
-            year = new_date.year + (month - 1) // 12
-            month = (month - 1) % 12 + 1
-            day = min(new_date.day, _last_day_of_month(year, month))
-            new_date = date(year, month, day)
-        expense.renewal_date = new_date
-        count += 1
-
+    today = literal(date.today(), Date)
+
+    stmt = (
+        update(Expense)
+        .where(
+            Expense.status == ExpenseStatus.ACTIVE,
+            Expense.expense_type == ExpenseType.RECURRING,
+            Expense.renewal_date.isnot(None),
+            Expense.renewal_date < today,
+            Expense.periodicity.isnot(None),
+        )
+        .values(
+            renewal_date=next_renewal_date(Expense.renewal_date, _renewal_interval(), today),
+            updated_at=datetime.now(timezone.utc),
+        )
+        .returning(Expense.id)
+        .execution_options(synchronize_session=False)
+    )
+    ids = list(db.execute(stmt).scalars())
     db.commit()
-    return count
+    return ids
 
 
 def _role_value(role) -> str:
@@ -216,13 +304,17 @@ def _role_value(role) -> str:
     return role.value if hasattr(role, "value") else str(role)
 
 
-def _validation_scope_filters(query, current_user: User):
-    """Aplica filtro de escopo por role (empresa + owner/created_by)."""
+def _validation_scope_filters(query, current_user: User, expense_joined: bool = False):
+    """
+    Aplica filtro de escopo por role (empresa + owner/created_by).
+    expense_joined: a query já tem join com Expense (não junta de novo).
+    """
     rv = _role_value(current_user.role)
     if rv in (UserRole.SYSTEM_ADMIN.value, UserRole.FINANCE_ADMIN.value):
         # System Admin e Finance Admin têm acesso total
         return query
-    query = query.join(Expense, ExpenseValidation.expense_id == Expense.id)
+    if not expense_joined:
+        query = query.join(Expense, ExpenseValidation.expense_id == Expense.id)
     if rv == UserRole.LEADER.value:
         company_ids = [c.id for c in current_user.companies] if current_user.companies else []
         if not company_ids:
@@ -233,62 +325,106 @@ def _validation_scope_filters(query, current_user: User):
     return query.filter(Expense.created_by_id == current_user.id)
 
 
+def _filtered_validations(
+    query,
+    current_user: User | None = None,
+    statuses: list[ValidationStatus] | None = None,
+    month: date | None = None,
+    expense_id: UUID | None = None,
+    company_ids: list[UUID] | None = None,
+    department_ids: list[UUID] | None = None,
+    owner_ids: list[UUID] | None = None,
+    service_name: str | None = None,
+):
+    """
+    Aplica escopo do role e filtros da aba Validações (status, mês, despesa, empresa,
+    setor, responsável e busca por nome) em uma query sobre ExpenseValidation.
+    Faz join com Expense. Retorna None quando algum filtro de lista é vazio (nenhum resultado).
+    """
+    query = query.join(Expense, ExpenseValidation.expense_id == Expense.id)
+    if current_user:
+        query = _validation_scope_filters(query, current_user, expense_joined=True)
+    query = apply_filters(
+        query,
+        company_ids=company_ids,
+        department_ids=department_ids,
+        owner_ids=owner_ids,
+        service_name=service_name,
+    )
+    if query is None:
+        return None
+    if statuses:
+        query = query.filter(ExpenseValidation.status.in_(statuses))
+    if month:
+        first_day = month.replace(day=1)
+        query = query.filter(ExpenseValidation.validation_month == first_day)
+    if expense_id:
+        query = query.filter(ExpenseValidation.expense_id == expense_id)
+    return query
+
+
+def _with_expense_relations(query):
+    """Carrega despesa (do join), empresa, setor, responsável e validador para a resposta."""
+    return query.options(
+        contains_eager(ExpenseValidation.expense).selectinload(Expense.company),
+        contains_eager(ExpenseValidation.expense).selectinload(Expense.department),
+        contains_eager(ExpenseValidation.expense).selectinload(Expense.owner),
+        selectinload(ExpenseValidation.validator),
+    )
+
+
 def get_pending(
     db: Session,
     month: date | None = None,
-    current_user: User | None = None
+    current_user: User | None = None,
+    **filters,
 ) -> list[ExpenseValidation]:
     """
     Lista validações pendentes. Se current_user for informado, filtra pelo escopo do role.
+    filters: company_ids, department_ids, owner_ids, service_name (ver _filtered_validations).
     """
-    query = db.query(ExpenseValidation).options(
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.company),
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.department),
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.owner),
-        joinedload(ExpenseValidation.validator)
-    ).filter(
-        ExpenseValidation.status == ValidationStatus.PENDING
+    query = _filtered_validations(
+        db.query(ExpenseValidation), current_user,
+        statuses=[ValidationStatus.PENDING], month=month, **filters
     )
-    if current_user:
-        query = _validation_scope_filters(query, current_user)
-    if month:
-        first_day = month.replace(day=1)
-        query = query.filter(ExpenseValidation.validation_month == first_day)
-    return query.order_by(ExpenseValidation.validation_month.desc()).all()
+    if query is None:
+        return []
+    return _with_expense_relations(query).order_by(ExpenseValidation.validation_month.desc()).all()
 
 
-def mark_overdue_validations(db: Session) -> int:
+def mark_overdue_validations(db: Session, emit_alerts: bool | None = None) -> int:
     """
-    Marca validações pendentes como atrasadas se passaram 4 dias do início do mês.
+    Marca validações pendentes como atrasadas quando passaram VALIDATION_OVERDUE_DAYS dias
+    do início do mês de referência (inclui meses anteriores que ficaram pendentes).
+    Um único UPDATE ... RETURNING. Com emit_alerts (padrão: VALIDATION_OVERDUE_ALERTS, exceto
+    com ALERT_DIGEST_MODE, em que as atrasadas vão no resumo diário), cria alertas
+    VALIDATION_OVERDUE para as validações marcadas, na mesma transação.
     Retorna o número de validações marcadas como atrasadas.
     """
-    today = date.today()
-    
-    # Calcular data limite: 4 dias após o primeiro dia do mês atual
-    first_day_current_month = today.replace(day=1)
-    deadline = first_day_current_month + timedelta(days=4)
-    
-    # Se ainda estamos nos primeiros 4 dias do mês, não marcar nada como atrasado
-    if today <= deadline:
-        return 0
-    
-    # Buscar validações pendentes do mês atual que estão atrasadas
-    overdue_validations = db.query(ExpenseValidation).filter(
-        and_(
+    from app.services import alert_service
+
+    if emit_alerts is None:
+        emit_alerts = settings.VALIDATION_OVERDUE_ALERTS and not settings.ALERT_DIGEST_MODE
+    today = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).date()
+    # Atrasada quando today > validation_month + prazo
+    cutoff = today - timedelta(days=settings.VALIDATION_OVERDUE_DAYS)
+
+    stmt = (
+        update(ExpenseValidation)
+        .where(
             ExpenseValidation.status == ValidationStatus.PENDING,
-            ExpenseValidation.validation_month == first_day_current_month,
-            ExpenseValidation.is_overdue == False
+            ExpenseValidation.is_overdue == False,
+            ExpenseValidation.validation_month < cutoff,
         )
-    ).all()
-    
-    count = 0
-    for validation in overdue_validations:
-        validation.is_overdue = True
-        validation.updated_at = datetime.now(timezone.utc)
-        count += 1
-    
+        .values(is_overdue=True, updated_at=datetime.now(timezone.utc))
+        .returning(ExpenseValidation.id)
+        .execution_options(synchronize_session=False)
+    )
+    overdue_ids = list(db.execute(stmt).scalars())
+    if emit_alerts and overdue_ids:
+        alert_service.create_validation_overdue_alerts(db, overdue_ids)
     db.commit()
-    return count
+    return len(overdue_ids)
 
 
 def get_by_expense_and_month(
@@ -318,32 +454,171 @@ def get_by_id(db: Session, validation_id: UUID) -> ExpenseValidation | None:
     ).first()
 
 
+def _decide_one(
+    db: Session,
+    validation_id: UUID,
+    decision: ValidationStatus,
+    validator_id: UUID,
+    charged_this_month: bool = False,
+) -> ExpenseValidation:
+    """Aprova/rejeita uma validação de forma atômica (UPDATE condicionado a status = 'pending')."""
+    decided = _apply_decision(db, [validation_id], decision, validator_id, charged_this_month)
+    if not decided:
+        db.rollback()
+        exists_ = db.query(ExpenseValidation.id).filter(ExpenseValidation.id == validation_id).first()
+        if not exists_:
+            raise ValueError("Validação não encontrada")
+        raise ValueError("Esta validação já foi processada")
+    validation = decided[0]
+    db.expunge(validation)  # valores do RETURNING já são os finais; evita SELECT de refresh após o commit
+    db.commit()
+    return validation
+
+
 def approve(db: Session, validation_id: UUID, validator_id: UUID) -> ExpenseValidation:
     """
     Aprova validação.
-    Preenche validator_id com o usuário que está aprovando.
+    Preenche validator_id com o usuário que está aprovando e avança a renewal_date
+    da despesa para o próximo ciclo, na mesma transação.
     """
-    validation = get_by_id(db, validation_id)
-    
-    if not validation:
-        raise ValueError("Validação não encontrada")
-    
-    if validation.status != ValidationStatus.PENDING:
-        raise ValueError("Esta validação já foi processada")
-    
-    validation.status = ValidationStatus.APPROVED
-    validation.validator_id = validator_id  # Preencher com quem está aprovando
-    validation.validated_at = datetime.now(timezone.utc)
-    validation.updated_at = datetime.now(timezone.utc)
+    return _decide_one(db, validation_id, ValidationStatus.APPROVED, validator_id)
 
-    # Avançar data de renovação da despesa para o próximo ciclo
-    if validation.expense:
-        _advance_expense_renewal_date_once(validation.expense)
 
+def get_decision_targets(db: Session, validation_ids: list[UUID]) -> dict:
+    """
+    Dados mínimos para checar permissão de aprovação/rejeição, em uma consulta e sem
+    carregar relacionamentos: {validation_id: Row(id, status, expense_id, owner_id, company_id)}.
+    A Row serve como "expense" para can_approve_expense (owner_id/company_id).
+    """
+    if not validation_ids:
+        return {}
+    rows = db.execute(
+        select(
+            ExpenseValidation.id,
+            ExpenseValidation.status,
+            ExpenseValidation.expense_id,
+            Expense.owner_id,
+            Expense.company_id,
+        )
+        .join(Expense, Expense.id == ExpenseValidation.expense_id)
+        .where(ExpenseValidation.id.in_(validation_ids))
+    ).all()
+    return {row.id: row for row in rows}
+
+
+def _apply_decision(
+    db: Session,
+    validation_ids: list[UUID],
+    decision: ValidationStatus,
+    validator_id: UUID,
+    charged_this_month: bool = False,
+) -> list[ExpenseValidation]:
+    """
+    Aprova/rejeita validações pendentes com UPDATE ... WHERE status = 'pending' RETURNING
+    (validações já processadas são ignoradas) e aplica os efeitos na despesa em um UPDATE:
+    - aprovação: avança renewal_date um ciclo por validação aprovada;
+    - rejeição: cancela a despesa no mês da validação (a mais antiga, se várias da mesma despesa).
+    Não faz commit. Retorna as validações que mudaram de status.
+    """
+    if not validation_ids:
+        return []
+    now = datetime.now(timezone.utc)
+    decided = db.scalars(
+        update(ExpenseValidation)
+        .where(
+            ExpenseValidation.id.in_(validation_ids),
+            ExpenseValidation.status == ValidationStatus.PENDING,
+        )
+        .values(status=decision, validator_id=validator_id, validated_at=now, updated_at=now)
+        .returning(ExpenseValidation)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not decided:
+        return []
+
+    if decision == ValidationStatus.APPROVED:
+        # Avançar data de renovação da despesa para o próximo ciclo
+        cycles = Counter(v.expense_id for v in decided)
+        targets = values(
+            column("expense_id", PG_UUID(as_uuid=True)), column("cycles", Integer), name="targets"
+        ).data(list(cycles.items()))
+        db.execute(
+            update(Expense)
+            .where(
+                Expense.id == targets.c.expense_id,
+                Expense.renewal_date.isnot(None),
+                Expense.periodicity.isnot(None),
+            )
+            .values(
+                renewal_date=renewal_date_after_cycles(
+                    Expense.renewal_date, _renewal_interval(), targets.c.cycles
+                ),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    else:
+        # Várias validações da mesma despesa rejeitadas juntas: cancela a partir da mais antiga
+        months: dict[UUID, date] = {}
+        for v in decided:
+            if v.expense_id not in months or v.validation_month < months[v.expense_id]:
+                months[v.expense_id] = v.validation_month
+        targets = values(
+            column("expense_id", PG_UUID(as_uuid=True)), column("validation_month", Date), name="targets"
+        ).data(list(months.items()))
+        db.execute(
+            update(Expense)
+            .where(Expense.id == targets.c.expense_id)
+            .values(
+                status=ExpenseStatus.CANCELLED,
+                cancellation_month=targets.c.validation_month,
+                charged_when_cancelled=charged_this_month,
+                cancelled_at=now,
+                cancelled_by_id=validator_id,
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        )
+    return decided
+
+
+def bulk_decide(
+    db: Session,
+    validation_ids: list[UUID],
+    approve: bool,
+    current_user: User,
+    charged_this_month: bool = False,
+) -> list[dict]:
+    """
+    Aprova ou rejeita várias validações em uma transação: uma consulta de permissão,
+    um UPDATE das validações e um UPDATE das despesas.
+    Retorna o resultado por id: approved/rejected, not_found, forbidden ou already_processed.
+    """
+    ids = list(dict.fromkeys(validation_ids))
+    targets = get_decision_targets(db, ids)
+
+    outcomes: dict[UUID, str] = {}
+    allowed = []
+    for validation_id in ids:
+        target = targets.get(validation_id)
+        if target is None:
+            outcomes[validation_id] = "not_found"
+        elif not can_approve_expense(current_user, target):
+            outcomes[validation_id] = "forbidden"
+        elif target.status != ValidationStatus.PENDING:
+            outcomes[validation_id] = "already_processed"
+        else:
+            allowed.append(validation_id)
+
+    decision = ValidationStatus.APPROVED if approve else ValidationStatus.REJECTED
+    decided = _apply_decision(db, allowed, decision, current_user.id, charged_this_month)
     db.commit()
-    db.refresh(validation)
 
-    return validation
+    decided_ids = {v.id for v in decided}
+    for validation_id in allowed:
+        # Processada por outra requisição entre a consulta e o UPDATE
+        outcomes[validation_id] = decision.value if validation_id in decided_ids else "already_processed"
+    return [{"id": validation_id, "outcome": outcomes[validation_id]} for validation_id in ids]
 
 
 def reject(
@@ -357,32 +632,7 @@ def reject(
     Muda o status da despesa para CANCELLED.
     Preenche cancellation_month (mês da validação) e charged_when_cancelled na despesa.
     """
-    validation = get_by_id(db, validation_id)
-    if not validation:
-        raise ValueError("Validação não encontrada")
-    if validation.status != ValidationStatus.PENDING:
-        raise ValueError("Esta validação já foi processada")
-
-    expense = db.query(Expense).filter(Expense.id == validation.expense_id).first()
-    if not expense:
-        raise ValueError("Despesa não encontrada")
-
-    validation.status = ValidationStatus.REJECTED
-    validation.validator_id = validator_id
-    validation.validated_at = datetime.now(timezone.utc)
-    validation.updated_at = datetime.now(timezone.utc)
-
-    now = datetime.now(timezone.utc)
-    expense.status = ExpenseStatus.CANCELLED
-    expense.cancellation_month = validation.validation_month
-    expense.charged_when_cancelled = charged_this_month
-    expense.cancelled_at = now
-    expense.cancelled_by_id = validator_id
-    expense.updated_at = now
-
-    db.commit()
-    db.refresh(validation)
-    return validation
+    return _decide_one(db, validation_id, ValidationStatus.REJECTED, validator_id, charged_this_month)
 
 
 def admin_cancel_approved_validation(
@@ -428,27 +678,158 @@ def get_history(
     status: ValidationStatus | None = None,
     month: date | None = None,
     expense_id: UUID | None = None,
-    current_user: User | None = None
+    current_user: User | None = None,
+    **filters,
 ) -> list[ExpenseValidation]:
     """
     Lista histórico de validações. Se current_user for informado, filtra pelo escopo do role.
+    filters: company_ids, department_ids, owner_ids, service_name (ver _filtered_validations).
     """
-    query = db.query(ExpenseValidation).options(
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.company),
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.department),
-        joinedload(ExpenseValidation.expense).subqueryload(Expense.owner),
-        joinedload(ExpenseValidation.validator)
+    query = _filtered_validations(
+        db.query(ExpenseValidation), current_user,
+        statuses=[status] if status else None, month=month, expense_id=expense_id, **filters
     )
-    if current_user:
-        query = _validation_scope_filters(query, current_user)
-    if status:
-        query = query.filter(ExpenseValidation.status == status)
-    if month:
-        first_day = month.replace(day=1)
-        query = query.filter(ExpenseValidation.validation_month == first_day)
-    if expense_id:
-        query = query.filter(ExpenseValidation.expense_id == expense_id)
-    return query.order_by(ExpenseValidation.validation_month.desc(), ExpenseValidation.created_at.desc()).all()
+    if query is None:
+        return []
+    return _with_expense_relations(query).order_by(
+        ExpenseValidation.validation_month.desc(), ExpenseValidation.created_at.desc()
+    ).all()
+
+
+def get_page(
+    db: Session,
+    current_user: User | None = None,
+    after: tuple[date, datetime, UUID] | None = None,
+    limit: int = 50,
+    include_total: bool = False,
+    include_facets: bool = False,
+    **filters,
+) -> tuple[list[ExpenseValidation], tuple[date, datetime, UUID] | None, int | None, dict | None]:
+    """
+    Página de validações por keyset em (validation_month, created_at, id), mais recente primeiro.
+    after: chave da última linha da página anterior.
+    filters: statuses, month, expense_id, company_ids, department_ids, owner_ids, service_name.
+    Retorna (itens, chave da próxima página ou None, total ou None, facetas ou None).
+    """
+    base = _filtered_validations(db.query(ExpenseValidation), current_user, **filters)
+    if base is None:
+        return [], None, (0 if include_total else None), (_empty_facets() if include_facets else None)
+
+    total = None
+    if include_total:
+        total = base.with_entities(func.count(ExpenseValidation.id)).order_by(None).scalar() or 0
+    facets = _facet_counts(db, base) if include_facets else None
+
+    query = _with_expense_relations(base)
+    if after is not None:
+        after_month, after_created_at, after_id = after
+        query = query.filter(
+            tuple_(ExpenseValidation.validation_month, ExpenseValidation.created_at, ExpenseValidation.id)
+            < tuple_(
+                literal(after_month, ExpenseValidation.validation_month.type),
+                literal(after_created_at, ExpenseValidation.created_at.type),
+                literal(after_id, ExpenseValidation.id.type),
+            )
+        )
+    rows = query.order_by(
+        ExpenseValidation.validation_month.desc(),
+        ExpenseValidation.created_at.desc(),
+        ExpenseValidation.id.desc(),
+    ).limit(limit + 1).all()
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_key = (last.validation_month, last.created_at, last.id)
+    return rows, next_key, total, facets
+
+
+def get_status_counts(
+    db: Session,
+    current_user: User | None = None,
+    month: date | None = None,
+    **filters,
+) -> dict:
+    """
+    Contagens de validações por situação (pendentes, atrasadas, aprovadas, rejeitadas)
+    no escopo do usuário e mês, em uma única agregação com FILTER, sem carregar linhas.
+    filters: company_ids, department_ids, owner_ids, service_name (ver _filtered_validations).
+    """
+    counts = {"pending": 0, "overdue": 0, "approved": 0, "rejected": 0, "total": 0}
+    query = _filtered_validations(db.query(ExpenseValidation), current_user, month=month, **filters)
+    if query is None:
+        return counts
+    is_pending = ExpenseValidation.status == ValidationStatus.PENDING
+    row = query.with_entities(
+        func.count().filter(is_pending).label("pending"),
+        func.count().filter(and_(is_pending, ExpenseValidation.is_overdue == True)).label("overdue"),
+        func.count().filter(ExpenseValidation.status == ValidationStatus.APPROVED).label("approved"),
+        func.count().filter(ExpenseValidation.status == ValidationStatus.REJECTED).label("rejected"),
+        func.count().label("total"),
+    ).order_by(None).one()
+    counts.update(row._asdict())
+    return counts
+
+
+FACET_DIMENSIONS = ("status", "company", "department", "owner")
+
+
+def _empty_facets() -> dict:
+    return {dimension: [] for dimension in FACET_DIMENSIONS}
+
+
+def _facet_counts(db: Session, base) -> dict:
+    """
+    Contagens por status, empresa, setor e responsável do conjunto filtrado,
+    em uma consulta com GROUPING SETS.
+    """
+    owner = aliased(User)
+    filtered = base.with_entities(
+        ExpenseValidation.status.label("status"),
+        Expense.company_id.label("company_id"),
+        Expense.department_id.label("department_id"),
+        Expense.owner_id.label("owner_id"),
+    ).order_by(None).subquery()
+    grouping = func.grouping(filtered.c.status, filtered.c.company_id, filtered.c.department_id, filtered.c.owner_id)
+    counts = db.query(
+        grouping.label("grouping_set"),
+        filtered.c.status,
+        filtered.c.company_id,
+        filtered.c.department_id,
+        filtered.c.owner_id,
+        func.count().label("count"),
+    ).group_by(
+        func.grouping_sets(
+            tuple_(filtered.c.status),
+            tuple_(filtered.c.company_id),
+            tuple_(filtered.c.department_id),
+            tuple_(filtered.c.owner_id),
+        )
+    ).subquery()
+    rows = db.query(
+        counts,
+        Company.name.label("company_name"),
+        Department.name.label("department_name"),
+        owner.name.label("owner_name"),
+    ).outerjoin(Company, Company.id == counts.c.company_id).outerjoin(
+        Department, Department.id == counts.c.department_id
+    ).outerjoin(owner, owner.id == counts.c.owner_id).all()
+
+    # Bit = 1 para as colunas agregadas: (status, company, department, owner)
+    facets = _empty_facets()
+    for row in rows:
+        if row.grouping_set == 0b0111:
+            facets["status"].append({"value": row.status.value, "label": row.status.value, "count": row.count})
+        elif row.grouping_set == 0b1011:
+            facets["company"].append({"value": str(row.company_id), "label": row.company_name, "count": row.count})
+        elif row.grouping_set == 0b1101:
+            facets["department"].append({"value": str(row.department_id), "label": row.department_name, "count": row.count})
+        elif row.grouping_set == 0b1110:
+            facets["owner"].append({"value": str(row.owner_id), "label": row.owner_name, "count": row.count})
+    for items in facets.values():
+        items.sort(key=lambda item: (-item["count"], item["label"] or ""))
+    return facets
 
 
 def get_all_for_expense(db: Session, expense_id: UUID) -> list[ExpenseValidation]:
@@ -458,48 +839,64 @@ def get_all_for_expense(db: Session, expense_id: UUID) -> list[ExpenseValidation
     ).order_by(ExpenseValidation.validation_month.desc()).all()
 
 
+def month_range(start_month: date, end_month: date) -> list[date]:
+    """Primeiros dias dos meses entre start_month e end_month (inclusive)."""
+    months = []
+    current = start_month.replace(day=1)
+    last = end_month.replace(day=1)
+    while current <= last:
+        months.append(current)
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return months
+
+
 def get_predicted_validations(
     db: Session,
-    target_month: date,
+    start_month: date,
+    end_month: date | None = None,
     current_user: User | None = None
 ) -> list[dict]:
     """
-    Retorna validações previstas para um mês futuro.
+    Retorna validações previstas para um mês futuro ou intervalo de meses (start_month..end_month).
     Não cria registros no banco, apenas calcula quais despesas teriam validação.
     IMPORTANTE: Apenas despesas com status ACTIVE são consideradas.
     Despesas canceladas (CANCELLED) ou com outros status não aparecem.
     Se current_user for informado, filtra pelo escopo do role.
+    Uma única consulta: despesas x meses (VALUES) filtradas pela periodicidade em SQL,
+    excluindo validações já criadas via anti-join (NOT EXISTS).
     Retorna lista de dicionários com dados da despesa e mês previsto.
     """
     from app.core.permissions import get_expense_scope_params
-    
-    first_day = target_month.replace(day=1)
-    
-    # Buscar APENAS despesas recorrentes ATIVAS (não canceladas)
-    # Filtro explícito: status == ACTIVE garante que canceladas não aparecem
-    query = db.query(Expense).options(
-        joinedload(Expense.category),
-        joinedload(Expense.company),
-        joinedload(Expense.department),
-        joinedload(Expense.owner),
-        joinedload(Expense.approver)
+
+    months = values(column("validation_month", Date), name="months").data(
+        [(m,) for m in month_range(start_month, end_month or start_month)]
+    )
+    month_col = months.c.validation_month
+
+    query = db.query(Expense, month_col).join(months, true()).options(
+        selectinload(Expense.company),
+        selectinload(Expense.department),
+        selectinload(Expense.owner),
     ).filter(
         Expense.status == ExpenseStatus.ACTIVE,  # Apenas ativas
-        Expense.expense_type == ExpenseType.RECURRING
+        _due_in_month_clause(month_col),
+        ~exists().where(
+            ExpenseValidation.expense_id == Expense.id,
+            ExpenseValidation.validation_month == month_col,
+        ),
     )
-    
+
     # Aplicar filtros de escopo se current_user for fornecido
     if current_user:
         scope = get_expense_scope_params(current_user)
         scope_company_ids = scope["company_ids"]
         scope_owner_ids = scope["owner_ids"]
         scope_department_ids = scope.get("department_ids")
-        
+
         # Se company_ids está vazio, retornar lista vazia
         if scope_company_ids is not None and len(scope_company_ids) == 0:
             return []
-        
-        # Aplicar filtros de escopo
+
         # Para líder, apenas company_ids é filtrado (owner_ids e department_ids são None)
         if scope_company_ids is not None:
             query = query.filter(Expense.company_id.in_(scope_company_ids))
@@ -507,27 +904,9 @@ def get_predicted_validations(
             query = query.filter(Expense.owner_id.in_(scope_owner_ids))
         if scope_department_ids is not None:
             query = query.filter(Expense.department_id.in_(scope_department_ids))
-    
-    active_expenses = query.all()
-    
-    predicted = []
-    
-    for expense in active_expenses:
-        # Verificar se deve ter validação para este mês baseado na periodicidade
-        if should_create_validation_for_month(expense, first_day):
-            # Verificar se já existe validação criada (se já foi criada, não é mais "prevista")
-            existing = db.query(ExpenseValidation).filter(
-                and_(
-                    ExpenseValidation.expense_id == expense.id,
-                    ExpenseValidation.validation_month == first_day
-                )
-            ).first()
-            
-            if not existing:
-                predicted.append({
-                    "expense": expense,
-                    "validation_month": first_day,
-                    "is_predicted": True
-                })
-    
-    return predicted
+
+    rows = query.order_by(month_col, Expense.service_name, Expense.id).all()
+    return [
+        {"expense": expense, "validation_month": validation_month, "is_predicted": True}
+        for expense, validation_month in rows
+    ]
@@ -1,10 +1,13 @@
 import logging
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from sqlalchemy import Date, Integer, String, cast, exists, func, literal
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import SessionLocal
 from app.services import alert_service
-from app.models.alert import Alert, AlertType, AlertStatus
+from app.models.alert import Alert
 from app.models.expense import Expense, ExpenseStatus
 from app.models.expense_validation import ExpenseValidation, ValidationStatus
 from app.models.user import User
@@ -14,86 +17,119 @@ logger = logging.getLogger(__name__)
 RENEWAL_ALERT_DAYS = [7, 3, 1]
 
 
-def _has_approved_validation(db: Session, expense_id, renewal_date) -> bool:
-    """Verifica se existe validação aprovada para a despesa no mês da renovação."""
-    validation_month = renewal_date.replace(day=1)
-    return db.query(ExpenseValidation).filter(
-        ExpenseValidation.expense_id == expense_id,
+def _renewal_candidates(db: Session, today: date) -> list:
+    """
+    Despesas ativas que renovam em exatamente N dias (N em RENEWAL_ALERT_DAYS), em uma consulta.
+    has_approved_validation: já existe validação aprovada no mês da renovação (anti-join).
+    has_alert: já existe alerta com a mesma chave de deduplicação (anti-join pelo índice único).
+    """
+    days_before = cast(Expense.renewal_date - literal(today, Date), Integer)
+    dedup_key = func.concat(
+        "renewal:", cast(Expense.id, String), ":", cast(Expense.renewal_date, String), ":", cast(days_before, String)
+    )
+    has_approved_validation = exists().where(
+        ExpenseValidation.expense_id == Expense.id,
         ExpenseValidation.status == ValidationStatus.APPROVED,
-        ExpenseValidation.validation_month == validation_month,
-    ).first() is not None
-
+        ExpenseValidation.validation_month == cast(func.date_trunc("month", Expense.renewal_date), Date),
+    )
+    has_alert = exists().where(Alert.dedup_key == dedup_key)
+    return db.query(
+        Expense.id.label("expense_id"),
+        Expense.service_name,
+        Expense.value_brl,
+        Expense.renewal_date,
+        Expense.contracted_plan,
+        days_before.label("days_before"),
+        User.id.label("owner_id"),
+        User.name.label("owner_name"),
+        has_approved_validation.label("has_approved_validation"),
+        has_alert.label("has_alert"),
+    ).join(User, User.id == Expense.owner_id).filter(
+        Expense.status == ExpenseStatus.ACTIVE,
+        Expense.renewal_date.in_([today + timedelta(days=d) for d in RENEWAL_ALERT_DAYS]),
+    ).all()
+
+
+def _pending_validation_items(db: Session) -> list:
+    """Validações pendentes de despesas ativas, com o responsável, para o resumo diário."""
+    return db.query(
+        ExpenseValidation.id.label("validation_id"),
+        ExpenseValidation.validation_month,
+        ExpenseValidation.is_overdue,
+        Expense.id.label("expense_id"),
+        Expense.service_name,
+        Expense.value_brl,
+        User.id.label("owner_id"),
+        User.name.label("owner_name"),
+    ).join(Expense, Expense.id == ExpenseValidation.expense_id).join(
+        User, User.id == Expense.owner_id
+    ).filter(
+        ExpenseValidation.status == ValidationStatus.PENDING,
+        Expense.status == ExpenseStatus.ACTIVE,
+    ).all()
+
+
+def create_daily_digest_alerts() -> dict:
+    """
+    Resumo diário (ALERT_DIGEST_MODE): um alerta DAILY_DIGEST por responsável com as
+    renovações em 7, 3 ou 1 dia (sem validação aprovada no mês) e as validações pendentes.
+    Duas consultas e um INSERT; no máximo um resumo por destinatário e dia.
+    """
+    db: Session = SessionLocal()
+    try:
+        today = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).date()
+        renewals = [c for c in _renewal_candidates(db, today) if not c.has_approved_validation]
+        validations = _pending_validation_items(db)
+        created_ids = alert_service.create_daily_digest_alerts(db, today, renewals, validations)
 
-def _alert_already_exists(db: Session, expense_id, days_until: int) -> bool:
-    """Verifica se já existe alerta para essa despesa com esse número de dias."""
-    title_pattern = f"Renovação em {days_until} dia"
-    return db.query(Alert).filter(
-        Alert.expense_id == expense_id,
-        Alert.alert_type == AlertType.RENEWAL_UPCOMING,
-        Alert.title.ilike(f"%{title_pattern}%"),
-        Alert.status.in_([AlertStatus.PENDING, AlertStatus.SENT]),
-    ).first() is not None
+        result = {
+            "success": True,
+            "digest_date": today.isoformat(),
+            "renewals": len(renewals),
+            "pending_validations": len(validations),
+            "alerts_created": len(created_ids),
+        }
+        logger.info("Resumo diário de alertas: %s", result)
+        return result
+    except Exception as e:
+        logger.exception("Erro ao criar resumo diário de alertas")
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
 
 
 def check_and_create_renewal_alerts_7_3_1() -> dict:
     """
-    Verifica despesas ativas com renewal_date nos próximos 7 dias
-    e cria alertas para 7, 3 e 1 dia antes da renovação.
+    Verifica despesas ativas com renewal_date em 7, 3 ou 1 dia
+    e cria alertas de renovação próxima.
 
     - O alerta é enviado ao owner (responsável) da despesa.
     - Se a despesa já possui validação aprovada para o mês da renovação,
       nenhum alerta é criado.
-    - Alertas duplicados (mesmo expense + mesmo nº de dias) são ignorados.
+    - Alertas duplicados (mesma despesa + data de renovação + nº de dias, via dedup_key)
+      são ignorados.
+    Uma consulta de candidatos e um INSERT em lote.
+    Com ALERT_DIGEST_MODE, delega para create_daily_digest_alerts.
     """
+    if settings.ALERT_DIGEST_MODE:
+        return create_daily_digest_alerts()
     db: Session = SessionLocal()
     try:
-        today = datetime.now().date()
-        max_ahead = today + timedelta(days=max(RENEWAL_ALERT_DAYS))
-
-        expenses = db.query(Expense).filter(
-            Expense.status == ExpenseStatus.ACTIVE,
-            Expense.renewal_date.isnot(None),
-            Expense.renewal_date >= today,
-            Expense.renewal_date <= max_ahead,
-        ).all()
-
-        alerts_created = 0
-        skipped_validated = 0
-        skipped_duplicate = 0
-        errors = []
-
-        for expense in expenses:
-            days_until = (expense.renewal_date - today).days
-
-            if days_until not in RENEWAL_ALERT_DAYS:
-                continue
-
-            try:
-                if _has_approved_validation(db, expense.id, expense.renewal_date):
-                    skipped_validated += 1
-                    continue
-
-                if _alert_already_exists(db, expense.id, days_until):
-                    skipped_duplicate += 1
-                    continue
-
-                alert_service.create_renewal_upcoming_alert(db, expense, days_until)
-                alerts_created += 1
-                logger.info(
-                    "Alerta de renovação criado: %s em %d dia(s) para owner %s",
-                    expense.service_name, days_until, expense.owner_id,
-                )
-            except Exception as e:
-                errors.append(f"Erro despesa {expense.id}: {e}")
-                logger.exception("Erro ao criar alerta para despesa %s", expense.id)
+        today = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).date()
+        candidates = _renewal_candidates(db, today)
+
+        skipped_validated = sum(1 for c in candidates if c.has_approved_validation)
+        to_create = [c for c in candidates if not c.has_approved_validation and not c.has_alert]
+        created_ids = alert_service.create_renewal_upcoming_alerts(db, to_create)
+        skipped_duplicate = len(candidates) - skipped_validated - len(created_ids)
 
         result = {
             "success": True,
-            "expenses_checked": len(expenses),
-            "alerts_created": alerts_created,
+            "expenses_checked": len(candidates),
+            "alerts_created": len(created_ids),
             "skipped_validated": skipped_validated,
             "skipped_duplicate": skipped_duplicate,
-            "errors": errors,
+            "errors": [],
         }
         logger.info("Verificação de renovação concluída: %s", result)
         return result
@@ -110,7 +146,12 @@ def check_and_create_renewal_alerts(days_ahead: int = 7) -> dict:
 
 
 def process_all_alerts() -> dict:
-    """Processa todos os alertas pendentes."""
+    """
+    Processa todos os alertas pendentes.
+    Com ALERT_DELIVERY_ENABLED, os pendentes são do worker de entrega (alert_delivery).
+    """
+    if settings.ALERT_DELIVERY_ENABLED:
+        return {"success": True, "skipped": "ALERT_DELIVERY_ENABLED"}
     db: Session = SessionLocal()
     try:
         stats = alert_service.process_pending_alerts(db, limit=100)
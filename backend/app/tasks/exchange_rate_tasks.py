@@ -0,0 +1,38 @@
+from datetime import date, datetime
+from zoneinfo import ZoneInfo
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import exchange_service
+
+
+def snapshot_exchange_rate_task() -> dict:
+    """
+    Garante o snapshot diário da cotação USD/BRL em exchange_rates.
+    Se o dia (APP_TIMEZONE) ainda não tem cotação, busca na API (o provider grava o upsert).
+    """
+    today = datetime.now(ZoneInfo(settings.APP_TIMEZONE)).date()
+    db: Session = SessionLocal()
+    try:
+        if exchange_service.has_rate_for_date(db, today):
+            return {"success": True, "rate_date": today.isoformat(), "fetched": False}
+    finally:
+        db.close()
+
+    result = exchange_service.usd_brl_rate_provider.refresh()
+    if result is None:
+        return {"success": False, "error": "Não foi possível obter a cotação USD/BRL"}
+    return {"success": True, "rate_date": today.isoformat(), "fetched": True, "rate": str(result.rate)}
+
+
+def revalue_usd_expenses_task(as_of: date | None = None, dry_run: bool = False) -> dict:
+    """Reavalia value_brl das despesas em USD com a cotação vigente em as_of (padrão: hoje)."""
+    db: Session = SessionLocal()
+    try:
+        result = exchange_service.revalue_usd_expenses(db, as_of=as_of, dry_run=dry_run)
+        return {"success": True, **result}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+    finally:
+        db.close()
@@ -1,4 +1,8 @@
-from datetime import date, datetime
+import logging
+import threading
+import time
+from datetime import date, datetime, timezone
+from uuid import uuid4
 from zoneinfo import ZoneInfo
 from sqlalchemy.orm import Session
 
@@ -6,6 +10,20 @@ from app.core.config import settings
 from app.core.database import SessionLocal
 from app.services import expense_validation_service
 
+logger = logging.getLogger(__name__)
+
+BACKFILL_CHUNK_MONTHS = 3
+MAX_BACKFILL_MONTHS = 120
+STARTUP_CATCH_UP_MAX_MONTHS = 24
+BACKFILL_JOB_TTL_SECONDS = 24 * 3600  # jobs finalizados ficam consultáveis por 24h
+MAX_BACKFILL_JOBS = 100
+
+# Jobs de backfill em memória, por processo: com vários workers, GET /backfill/{job_id} só
+# encontra o job no processo que o executa (nos demais, 404). Jobs finalizados expiram após
+# BACKFILL_JOB_TTL_SECONDS e, acima de MAX_BACKFILL_JOBS, os finalizados mais antigos saem.
+_backfill_jobs: dict[str, dict] = {}
+_backfill_lock = threading.Lock()
+
 
 def _get_current_month_date() -> date:
     """Retorna o primeiro dia do mês atual no timezone configurado (APP_TIMEZONE)."""
@@ -56,9 +74,139 @@ def advance_renewal_dates_task() -> dict:
     """
     db: Session = SessionLocal()
     try:
-        count = expense_validation_service.advance_renewal_dates(db)
-        return {"success": True, "advanced": count}
+        advanced_ids = expense_validation_service.advance_renewal_dates(db)
+        return {"success": True, "advanced": len(advanced_ids)}
     except Exception as e:
         return {"success": False, "error": str(e)}
     finally:
         db.close()
+
+
+def _prune_backfill_jobs() -> None:
+    """Remove jobs finalizados expirados ou excedentes. Chamar com _backfill_lock."""
+    now = datetime.now(timezone.utc)
+    finished = sorted(
+        (job for job in _backfill_jobs.values() if job["finished_at"] is not None),
+        key=lambda job: job["finished_at"],
+    )
+    excess = len(_backfill_jobs) - MAX_BACKFILL_JOBS + 1
+    for job in finished:
+        if excess > 0 or (now - job["finished_at"]).total_seconds() > BACKFILL_JOB_TTL_SECONDS:
+            del _backfill_jobs[job["id"]]
+            excess -= 1
+
+
+def create_backfill_job(month_from: date, month_to: date, chunk_months: int = BACKFILL_CHUNK_MONTHS) -> dict:
+    """Registra um job de backfill de validações (month_from..month_to) e retorna seu estado inicial."""
+    months = expense_validation_service.month_range(month_from, month_to)
+    job = {
+        "id": str(uuid4()),
+        "status": "pending",
+        "month_from": months[0] if months else month_from.replace(day=1),
+        "month_to": months[-1] if months else month_to.replace(day=1),
+        "chunk_months": chunk_months,
+        "months_total": len(months),
+        "months_done": 0,
+        "validations_created": 0,
+        "current_month": None,
+        "started_at": None,
+        "finished_at": None,
+        "elapsed_seconds": 0.0,
+        "error": None,
+    }
+    with _backfill_lock:
+        _prune_backfill_jobs()
+        _backfill_jobs[job["id"]] = job
+    return dict(job)
+
+
+def get_backfill_job(job_id: str) -> dict | None:
+    """Estado atual (cópia) de um job de backfill."""
+    with _backfill_lock:
+        job = _backfill_jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def _update_job(job_id: str, **changes) -> None:
+    with _backfill_lock:
+        _backfill_jobs[job_id].update(changes)
+
+
+def run_backfill_job(job_id: str) -> dict:
+    """
+    Executa o backfill em blocos de chunk_months meses: um INSERT ... SELECT e um commit
+    por bloco, atualizando o progresso (meses concluídos, validações criadas, tempo decorrido).
+    """
+    job = get_backfill_job(job_id)
+    months = expense_validation_service.month_range(job["month_from"], job["month_to"])
+    chunk_months = job["chunk_months"]
+    started = time.monotonic()
+    _update_job(job_id, status="running", started_at=datetime.now(timezone.utc))
+
+    db: Session = SessionLocal()
+    try:
+        created = 0
+        for i in range(0, len(months), chunk_months):
+            chunk = months[i:i + chunk_months]
+            _update_job(job_id, current_month=chunk[0])
+            created += len(expense_validation_service.create_validations_for_months(db, chunk))
+            _update_job(
+                job_id,
+                months_done=i + len(chunk),
+                validations_created=created,
+                elapsed_seconds=round(time.monotonic() - started, 3),
+            )
+        _update_job(job_id, status="completed", current_month=None)
+    except Exception as e:
+        db.rollback()
+        logger.exception("Erro no backfill de validações %s", job_id)
+        _update_job(job_id, status="failed", error=str(e))
+    finally:
+        db.close()
+        _update_job(
+            job_id,
+            finished_at=datetime.now(timezone.utc),
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+    return get_backfill_job(job_id)
+
+
+def catch_up_validations_task() -> dict:
+    """
+    Catch-up no startup: gera validações de todos os meses desde o último mês com validações
+    até o mês atual (limitado a STARTUP_CATCH_UP_MAX_MONTHS), para cobrir períodos em que
+    o serviço ficou fora do ar no dia 1. Também marca validações atrasadas.
+    """
+    current_month = _get_current_month_date()
+    try:
+        db: Session = SessionLocal()
+        try:
+            last_month = expense_validation_service.get_last_validation_month(db)
+        finally:
+            db.close()
+
+        month_from = current_month
+        if last_month is not None and last_month < current_month:
+            oldest = current_month.year * 12 + current_month.month - 1 - STARTUP_CATCH_UP_MAX_MONTHS
+            month_from = max(last_month, date(oldest // 12, oldest % 12 + 1, 1))
+
+        job = create_backfill_job(month_from, current_month)
+        result = run_backfill_job(job["id"])
+        if result["status"] != "completed":
+            return {"success": False, "error": result["error"]}
+
+        db = SessionLocal()
+        try:
+            overdue_count = expense_validation_service.mark_overdue_validations(db)
+        finally:
+            db.close()
+        return {
+            "success": True,
+            "month_from": month_from.isoformat(),
+            "month_to": current_month.isoformat(),
+            "validations_created": result["validations_created"],
+            "overdue_marked": overdue_count,
+        }
+    except Exception as e:
+        logger.exception("Erro no catch-up de validações")
+        return {"success": False, "error": str(e)}
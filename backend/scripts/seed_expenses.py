@@ -31,13 +31,16 @@ from app.services.company_service import get_by_name, create as create_company
 from app.services.department_service import get_by_name_and_company, create as create_department
 from app.services.category_service import get_by_name, create as create_category
 from app.services.user_service import get_by_email, create as create_user
-from app.services.exchange_service import get_usd_to_brl_rate_sync, USD_BRL_FALLBACK_RATE
+from app.services.exchange_service import get_usd_to_brl_rate_sync
 from app.schemas.expense import ExpenseCreate
 from app.schemas.company import CompanyCreate
 from app.schemas.department import DepartmentCreate
 from app.schemas.category import CategoryCreate
 from app.schemas.user import UserCreate
 
+# Taxa usada no seed quando a API de cotações falha
+USD_BRL_FALLBACK_RATE = Decimal("5.50")
+
 
 # Dados de exemplo para despesas
 EXPENSE_TEMPLATES = [
@@ -0,0 +1,100 @@
+"""
+Fixtures dos testes com banco. TEST_DATABASE_URL deve apontar para um PostgreSQL com as
+migrations aplicadas (alembic upgrade head); sem ela, os testes com banco são ignorados.
+Cada teste roda em uma transação desfeita ao final (commits viram savepoints).
+"""
+import os
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql+psycopg2://localhost/unused")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.models.category import Category  # noqa: E402
+from app.models.company import Company  # noqa: E402
+from app.models.department import Department  # noqa: E402
+from app.models.expense import (  # noqa: E402
+    Currency, Expense, ExpenseStatus, ExpenseType, PaymentMethod, Periodicity,
+)
+from app.models.user import User, UserRole  # noqa: E402
+
+requires_db = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL não definida")
+    engine = create_engine(TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        session = Session(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+@pytest.fixture
+def make_user(db):
+    def make(role: UserRole = UserRole.SYSTEM_ADMIN) -> User:
+        suffix = uuid4().hex[:12]
+        user = User(
+            name=f"Teste {suffix}", email=f"teste-{suffix}@example.com",
+            password_hash="x", role=role, is_active=True,
+        )
+        db.add(user)
+        db.flush()
+        return user
+    return make
+
+
+@pytest.fixture
+def make_expense(db, make_user):
+    def make(owner: User | None = None, **overrides) -> Expense:
+        suffix = uuid4().hex[:12]
+        owner = owner or make_user()
+        company = Company(name=f"Empresa {suffix}", is_active=True)
+        category = Category(name=f"Categoria {suffix}", is_active=True)
+        db.add_all([company, category])
+        db.flush()
+        department = Department(name=f"Setor {suffix}", company_id=company.id, is_active=True)
+        db.add(department)
+        db.flush()
+        fields = dict(
+            code=f"T{suffix}",
+            service_name=f"Serviço {suffix}",
+            expense_type=ExpenseType.RECURRING,
+            category_id=category.id,
+            company_id=company.id,
+            department_id=department.id,
+            owner_id=owner.id,
+            approver_id=owner.id,
+            value=Decimal("10.00"),
+            currency=Currency.BRL,
+            value_brl=Decimal("10.00"),
+            periodicity=Periodicity.MONTHLY,
+            renewal_date=date(2026, 11, 10),
+            payment_method=PaymentMethod.PIX,
+            status=ExpenseStatus.ACTIVE,
+        )
+        fields.update(overrides)
+        expense = Expense(**fields)
+        db.add(expense)
+        db.flush()
+        return expense
+    return make
@@ -0,0 +1,91 @@
+"""
+alert_unread_counters, mantido pelos triggers por comando em alerts (migration s1t2u3v4w5x6),
+deve ser igual a count(*) dos alertas não lidos de cada usuário após INSERT em lote,
+marcar como lido, troca de destinatário e DELETE.
+Requer PostgreSQL migrado em TEST_DATABASE_URL (ver conftest.py).
+"""
+from sqlalchemy import delete, func, insert, select, update
+
+from app.models.alert import Alert, AlertChannel, AlertStatus, AlertType
+from app.models.alert_unread_counter import AlertUnreadCounter
+from app.services import alert_service
+from app.services.alert_service import UNREAD_STATUSES
+
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+
+def _assert_counters_match(db, users) -> dict:
+    user_ids = [u.id for u in users]
+    counters = dict(
+        db.execute(
+            select(AlertUnreadCounter.user_id, AlertUnreadCounter.unread_count)
+            .where(AlertUnreadCounter.user_id.in_(user_ids))
+        ).all()
+    )
+    counts = dict(
+        db.execute(
+            select(Alert.recipient_id, func.count())
+            .where(Alert.recipient_id.in_(user_ids), Alert.status.in_(UNREAD_STATUSES))
+            .group_by(Alert.recipient_id)
+        ).all()
+    )
+    actual = {user_id: counters.get(user_id, 0) for user_id in user_ids}
+    expected = {user_id: counts.get(user_id, 0) for user_id in user_ids}
+    assert actual == expected
+    return actual
+
+
+def _alert_rows(recipient, statuses):
+    return [
+        {
+            "alert_type": AlertType.VALIDATION_PENDING,
+            "title": "Teste",
+            "message": "Teste",
+            "recipient_id": recipient.id,
+            "channel": AlertChannel.EMAIL,
+            "status": status,
+        }
+        for status in statuses
+    ]
+
+
+def test_unread_counters_follow_alert_changes(db, make_user):
+    first, second, third = make_user(), make_user(), make_user()
+    users = (first, second, third)
+
+    # INSERT em lote (um comando) com todos os status e vários destinatários
+    ids = db.execute(
+        insert(Alert).returning(Alert.id, sort_by_parameter_order=True),
+        _alert_rows(first, [AlertStatus.PENDING, AlertStatus.SENT, AlertStatus.SENT, AlertStatus.READ])
+        + _alert_rows(second, [AlertStatus.PENDING, AlertStatus.FAILED, AlertStatus.SENT]),
+    ).scalars().all()
+    first_ids, second_ids = ids[:4], ids[4:]
+    db.flush()
+    assert _assert_counters_match(db, users) == {first.id: 3, second.id: 2, third.id: 0}
+
+    # Marcar como lido (caminho do endpoint) e em lote
+    alert_service.mark_as_read(db, first_ids[0])
+    db.execute(
+        update(Alert).where(Alert.id.in_(second_ids)).values(status=AlertStatus.READ)
+        .execution_options(synchronize_session=False)
+    )
+    assert _assert_counters_match(db, users) == {first.id: 2, second.id: 0, third.id: 0}
+
+    # Troca de destinatário no mesmo UPDATE: um não lido e um lido saem de first;
+    # um não lido de second (já lido acima, volta a SENT) vai para third
+    db.execute(
+        update(Alert).where(Alert.id.in_([first_ids[1], first_ids[3]])).values(recipient_id=second.id)
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(Alert).where(Alert.id == second_ids[2]).values(recipient_id=third.id, status=AlertStatus.SENT)
+        .execution_options(synchronize_session=False)
+    )
+    assert _assert_counters_match(db, users) == {first.id: 1, second.id: 1, third.id: 1}
+
+    # DELETE em lote misturando lidos e não lidos de vários usuários
+    db.execute(delete(Alert).where(Alert.id.in_([first_ids[2], first_ids[3], second_ids[1], second_ids[2]])))
+    assert _assert_counters_match(db, users) == {first.id: 0, second.id: 1, third.id: 0}
+    assert alert_service.get_unread_count(db, second.id) == 1
@@ -0,0 +1,89 @@
+"""
+Paridade da regra "despesa gera validação no mês" entre o SQL usado nos INSERTs em lote
+(_due_in_month_clause) e a referência em Python (should_create_validation_for_month),
+incluindo created_at perto da virada do mês em APP_TIMEZONE.
+Requer PostgreSQL migrado em TEST_DATABASE_URL (ver conftest.py).
+"""
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, column, select, true, values
+
+from app.core.config import settings
+from app.models.expense import Expense, ExpenseType, Periodicity
+from app.services.expense_validation_service import (
+    _due_in_month_clause,
+    should_create_validation_for_month,
+)
+
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+APP_TZ = ZoneInfo(settings.APP_TIMEZONE)
+PERIODICITIES = (*Periodicity, None)
+RENEWAL_DATES = (None, date(2026, 2, 10), date(2026, 3, 31), date(2027, 1, 5))
+TARGET_MONTHS = [date(2025 + (m - 1) // 12, (m - 1) % 12 + 1, 1) for m in range(12, 12 + 19)]
+
+
+def _created_at_values() -> list[datetime]:
+    """Instantes a 1 minuto da meia-noite de 01/03 em APP_TIMEZONE (e em UTC)."""
+    local_midnight = datetime(2026, 3, 1, tzinfo=APP_TZ)
+    utc_midnight = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    return [
+        (instant + delta).astimezone(timezone.utc)
+        for instant in (local_midnight, utc_midnight)
+        for delta in (timedelta(minutes=-1), timedelta(minutes=1))
+    ]
+
+
+def test_due_in_month_clause_matches_python_reference(db, make_user, make_expense):
+    owner = make_user()
+    expenses = [
+        make_expense(
+            owner=owner,
+            expense_type=expense_type,
+            periodicity=periodicity,
+            renewal_date=renewal_date,
+            created_at=created_at,
+        )
+        for expense_type in (ExpenseType.RECURRING, ExpenseType.ONE_TIME)
+        for periodicity in PERIODICITIES
+        for renewal_date in RENEWAL_DATES
+        for created_at in _created_at_values()
+    ]
+    for expense in expenses:
+        db.refresh(expense)
+
+    months = values(column("month", Date), name="months").data([(m,) for m in TARGET_MONTHS])
+    got = set(
+        db.execute(
+            select(Expense.id, months.c.month)
+            .select_from(Expense)
+            .join(months, true())
+            .where(Expense.id.in_([e.id for e in expenses]), _due_in_month_clause(months.c.month))
+        ).all()
+    )
+    expected = {
+        (expense.id, month)
+        for expense in expenses
+        for month in TARGET_MONTHS
+        if should_create_validation_for_month(expense, month)
+    }
+
+    assert expected  # a grade cobre casos positivos
+    by_id = {e.id: e for e in expenses}
+    mismatches = sorted(
+        (str(by_id[i].periodicity), by_id[i].renewal_date, by_id[i].created_at, m, (i, m) in got)
+        for i, m in got ^ expected
+    )
+    assert mismatches == []
+
+
+def test_creation_month_uses_app_timezone(db, make_expense):
+    # 28/02 23:30 em APP_TIMEZONE (já 01/03 em UTC para fusos a oeste): criada em fevereiro,
+    # então março já gera validação
+    created_at = datetime(2026, 2, 28, 23, 30, tzinfo=APP_TZ).astimezone(timezone.utc)
+    expense = make_expense(periodicity=Periodicity.MONTHLY, renewal_date=None, created_at=created_at)
+    assert should_create_validation_for_month(expense, date(2026, 3, 1))
+    assert db.scalar(select(_due_in_month_clause(date(2026, 3, 1))).where(Expense.id == expense.id))
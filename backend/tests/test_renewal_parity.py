@@ -0,0 +1,144 @@
+"""
+Paridade do avanço de renewal_date em SQL (advance_renewal_dates / aprovação de validações)
+com o avanço ciclo a ciclo original em Python (dia limitado ao fim de cada mês, limite persistente).
+
+Requer PostgreSQL: TEST_DATABASE_URL (ex.: postgresql+psycopg2://postgres@/postgres?host=/tmp/pgdata).
+Sem ela, os testes são ignorados.
+"""
+import os
+from datetime import date, timedelta
+
+import pytest
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+os.environ.setdefault("DATABASE_URL", TEST_DATABASE_URL or "postgresql+psycopg2://localhost/unused")
+os.environ.setdefault("JWT_SECRET_KEY", "test")
+
+from sqlalchemy import Date, Integer, column, create_engine, select, values  # noqa: E402
+
+from app.services.expense_validation_service import (  # noqa: E402
+    PERIODICITY_MONTHS,
+    next_renewal_date,
+    renewal_date_after_cycles,
+)
+
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL não definida")
+
+INTERVALS = sorted(set(PERIODICITY_MONTHS.values()))
+START_DAYS = (1, 15, 28, 29, 30, 31)
+TODAYS = (
+    date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1), date(2024, 12, 31),
+    date(2025, 1, 1), date(2025, 2, 28), date(2025, 3, 31), date(2028, 2, 29),
+)
+
+
+def _last_day_of_month(year: int, month: int) -> int:
+    if month == 12:
+        next_first = date(year + 1, 1, 1)
+    else:
+        next_first = date(year, month + 1, 1)
+    return (next_first - timedelta(days=1)).day
+
+
+def _advance_once(value: date, interval: int) -> date:
+    """Avanço de um ciclo como o antigo _advance_expense_renewal_date_once."""
+    month = value.month + interval
+    year = value.year + (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return date(year, month, min(value.day, _last_day_of_month(year, month)))
+
+
+def _legacy_next_renewal(value: date, interval: int, today: date) -> date:
+    """Laço original de advance_renewal_dates."""
+    while value < today:
+        value = _advance_once(value, interval)
+    return value
+
+
+def _start_dates():
+    for year in (2023, 2024):
+        for month in range(1, 13):
+            for day in START_DAYS:
+                if day <= _last_day_of_month(year, month):
+                    yield date(year, month, day)
+
+
+@pytest.fixture(scope="module")
+def connection():
+    engine = create_engine(TEST_DATABASE_URL)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+def test_next_renewal_date_matches_legacy_loop(connection):
+    cases = [
+        (start, interval, today)
+        for start in _start_dates()
+        for interval in INTERVALS
+        for today in TODAYS
+        if start < today
+    ]
+    table = values(
+        column("start", Date), column("interval", Integer), column("today", Date), name="cases"
+    ).data(cases)
+    rows = connection.execute(
+        select(
+            table.c.start,
+            table.c.interval,
+            table.c.today,
+            next_renewal_date(table.c.start, table.c.interval, table.c.today),
+        )
+    ).all()
+
+    assert len(rows) == len(cases)
+    mismatches = [
+        (start, interval, today, got, _legacy_next_renewal(start, interval, today))
+        for start, interval, today, got in rows
+        if got != _legacy_next_renewal(start, interval, today)
+    ]
+    assert mismatches == []
+
+
+def test_renewal_date_after_cycles_matches_repeated_single_advance(connection):
+    cases = [
+        (start, interval, cycles)
+        for start in _start_dates()
+        for interval in INTERVALS
+        for cycles in (1, 2, 3, 13)
+    ]
+    table = values(
+        column("start", Date), column("interval", Integer), column("cycles", Integer), name="cases"
+    ).data(cases)
+    rows = connection.execute(
+        select(
+            table.c.start,
+            table.c.interval,
+            table.c.cycles,
+            renewal_date_after_cycles(table.c.start, table.c.interval, table.c.cycles),
+        )
+    ).all()
+
+    def expected(start, interval, cycles):
+        for _ in range(cycles):
+            start = _advance_once(start, interval)
+        return start
+
+    assert len(rows) == len(cases)
+    mismatches = [
+        (start, interval, cycles, got, expected(start, interval, cycles))
+        for start, interval, cycles, got in rows
+        if got != expected(start, interval, cycles)
+    ]
+    assert mismatches == []
+
+
+def test_month_end_clamp_is_sticky(connection):
+    jan_31 = date(2023, 1, 31)
+    got = connection.execute(
+        select(
+            renewal_date_after_cycles(jan_31, 1, 1),
+            renewal_date_after_cycles(jan_31, 1, 2),
+        )
+    ).one()
+    assert tuple(got) == (date(2023, 2, 28), date(2023, 3, 28))
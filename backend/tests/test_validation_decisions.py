@@ -0,0 +1,54 @@
+"""
+Efeitos na despesa da aprovação/rejeição em lote de validações (bulk_decide).
+Requer PostgreSQL migrado em TEST_DATABASE_URL (ver conftest.py).
+"""
+from datetime import date
+
+from app.models.expense import ExpenseStatus
+from app.models.expense_validation import ExpenseValidation, ValidationStatus
+from app.services import expense_validation_service
+
+from tests.conftest import requires_db
+
+pytestmark = requires_db
+
+MONTHS = (date(2026, 11, 1), date(2026, 12, 1), date(2027, 1, 1))
+
+
+def _pending_validations(db, expense) -> list[ExpenseValidation]:
+    validations = [
+        ExpenseValidation(expense_id=expense.id, validation_month=month, status=ValidationStatus.PENDING)
+        for month in MONTHS
+    ]
+    db.add_all(validations)
+    db.flush()
+    return validations
+
+
+def test_bulk_reject_cancels_from_earliest_validation_month(db, make_user, make_expense):
+    admin = make_user()
+    expense = make_expense()
+    validations = _pending_validations(db, expense)
+
+    # Ordem dos ids invertida: o mês de cancelamento não pode depender da ordem de RETURNING
+    outcomes = expense_validation_service.bulk_decide(
+        db, [v.id for v in reversed(validations)], approve=False, current_user=admin,
+    )
+
+    assert {o["outcome"] for o in outcomes} == {ValidationStatus.REJECTED.value}
+    db.refresh(expense)
+    assert expense.status == ExpenseStatus.CANCELLED
+    assert expense.cancellation_month == MONTHS[0]
+    assert expense.cancelled_by_id == admin.id
+
+
+def test_bulk_approve_advances_one_cycle_per_validation(db, make_user, make_expense):
+    admin = make_user()
+    expense = make_expense(renewal_date=date(2026, 11, 10))
+    validations = _pending_validations(db, expense)
+
+    expense_validation_service.bulk_decide(db, [v.id for v in validations], approve=True, current_user=admin)
+
+    db.refresh(expense)
+    assert expense.status == ExpenseStatus.ACTIVE
+    assert expense.renewal_date == date(2027, 2, 10)
@@ -3,6 +3,7 @@ import {
   CheckCircle2,
   AlertTriangle,
   Calendar,
+  ListChecks,
   XCircle,
 } from 'lucide-react';
 import type { AlertType, Currency } from '@/types';
@@ -69,6 +70,7 @@ export function getAlertTypeIcon(type: AlertType): React.ElementType {
     renewal_upcoming: Calendar,
     renewal_due: Bell,
     expense_cancellation: XCircle,
+    daily_digest: ListChecks,
   };
   return icons[type] || Bell;
 }
@@ -80,6 +82,7 @@ export function getAlertTypeLabel(type: AlertType): string {
     renewal_upcoming: 'Renovação Próxima',
     renewal_due: 'Renovação no Prazo',
     expense_cancellation: 'Cancelamento',
+    daily_digest: 'Resumo Diário',
   };
   return labels[type] || type;
 }
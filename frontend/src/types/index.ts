@@ -161,7 +161,7 @@ export interface CreateMonthlyValidationsResponse {
 }
 
 // Alert Types (backend)
-export type AlertType = 'validation_pending' | 'validation_overdue' | 'renewal_upcoming' | 'renewal_due' | 'expense_cancellation';
+export type AlertType = 'validation_pending' | 'validation_overdue' | 'renewal_upcoming' | 'renewal_due' | 'expense_cancellation' | 'daily_digest';
 export type AlertStatus = 'pending' | 'sent' | 'failed' | 'read';
 
 export interface Alert {
@@ -177,6 +177,7 @@ export interface Alert {
   sent_at?: string;
   read_at?: string;
   error_message?: string;
+  payload?: Record<string, unknown> | null; // daily_digest: itens do resumo
   created_at: string;
   updated_at?: string;
   recipient?: User;